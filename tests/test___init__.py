@@ -2,6 +2,7 @@ import logging
 import os
 import sys
 
+from botocore.stub import Stubber
 import pytest
 
 from topshelfsoftware_logging import get_logger
@@ -24,7 +25,21 @@ logger = get_logger(f"test_{MODULE}", stream=sys.stdout)
 # ----------------------------------------------------------------------------#
 #                           --- Module Imports ---                            #
 # ----------------------------------------------------------------------------#
-from topshelfsoftware_aws_util import debug, get_package_loggers  # noqa: E402
+from topshelfsoftware_aws_util import (  # noqa: E402
+    debug,
+    get_package_loggers,
+    prefetch,
+)
+from topshelfsoftware_aws_util.secrets import (  # noqa: E402
+    clear_secret_cache,
+    get_secret_value,
+    secret_client,
+)
+from topshelfsoftware_aws_util.ssm import (  # noqa: E402
+    clear_ssm_cache,
+    get_ssm_value,
+    ssm_client,
+)
 
 
 # ----------------------------------------------------------------------------#
@@ -47,3 +62,71 @@ def test_01_debug(get_event_as_dict):
     assert all(
         pkg_logger.level == logging.DEBUG for pkg_logger in pkg_loggers
     ), f"Not all loggers are at the {logging.DEBUG} level"
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file", get_json_files(MODULE_EVENTS_DIR, ["prefetch", "resp"])
+)
+def test_02_prefetch(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    manifest: dict = get_event_as_dict["input"]["manifest"]
+    max_workers: int = get_event_as_dict["input"]["max_workers"]
+    stubs: dict = get_event_as_dict["input"]["stubs"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 clients
+    stubbers = {
+        "secretsmanager": Stubber(secret_client),
+        "ssm": Stubber(ssm_client),
+    }
+    for service, stub_calls in stubs.items():
+        for stub_call in stub_calls:
+            if "error" in stub_call:
+                stubbers[service].add_client_error(
+                    stub_call["method"],
+                    service_error_code=stub_call["error"],
+                    expected_params=stub_call["parameters"],
+                )
+            else:
+                stubbers[service].add_response(
+                    stub_call["method"],
+                    stub_call["response"],
+                    stub_call["parameters"],
+                )
+
+    try:
+        # Activate the stubbers
+        for stubber in stubbers.values():
+            stubber.activate()
+        clear_secret_cache()
+        clear_ssm_cache()
+
+        # Test the source code
+        report = prefetch(manifest, max_workers=max_workers)
+        assert report.loaded == expected_output["loaded"]
+        assert sorted(report.failures) == sorted(expected_output["failures"])
+        assert set(report.timings) == {
+            *[task for task in ("secrets", "ssm_names") if manifest[task]],
+            *[f"ssm_path:{path}" for path in manifest["ssm_paths"]],
+        }
+        for stubber in stubbers.values():
+            stubber.assert_no_pending_responses()
+
+        # prefetched values are served from the caches
+        cached = expected_output["cached"]
+        for secret_id, secret in cached["secrets"].items():
+            assert get_secret_value(secret_id, use_cache=True) == secret
+        for param in cached["ssm"]:
+            lookup_kwargs = {"use_cache": True}
+            if "with_decryption" in param:
+                lookup_kwargs["with_decryption"] = param["with_decryption"]
+            assert get_ssm_value(param["name"], **lookup_kwargs) == (
+                param["value"]
+            )
+    finally:
+        # Deactivate the stubbers
+        for stubber in stubbers.values():
+            stubber.deactivate()
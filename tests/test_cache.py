@@ -0,0 +1,311 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from topshelfsoftware_aws_util.cache import logger as cache_logger
+from topshelfsoftware_logging import add_log_stream, get_logger
+
+from conftest import get_json_files, print_section_break
+
+# ----------------------------------------------------------------------------#
+#                               --- Globals ---                               #
+# ----------------------------------------------------------------------------#
+from __setup__ import TEST_EVENTS_PATH
+
+MODULE = "cache"
+MODULE_EVENTS_DIR = os.path.join(TEST_EVENTS_PATH, MODULE)
+
+# ----------------------------------------------------------------------------#
+#                               --- Logging ---                               #
+# ----------------------------------------------------------------------------#
+logger = get_logger(f"test_{MODULE}", stream=sys.stdout)
+add_log_stream(cache_logger, level=logging.DEBUG, stream=sys.stdout)
+
+# ----------------------------------------------------------------------------#
+#                           --- Module Imports ---                            #
+# ----------------------------------------------------------------------------#
+from topshelfsoftware_aws_util.cache import (  # noqa: E402
+    SharedFileCache,
+    SingleFlight,
+    TTLCache,
+)
+
+
+# ----------------------------------------------------------------------------#
+#                                --- TESTS ---                                #
+# ----------------------------------------------------------------------------#
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file", get_json_files(MODULE_EVENTS_DIR, ["ttl_cache", "expiry"])
+)
+def test_01_ttl_cache(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    cache_kwargs: dict = get_event_as_dict["input"]["cache_kwargs"]
+    key: str = get_event_as_dict["input"]["key"]
+    value: str = get_event_as_dict["input"]["value"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    cache = TTLCache(**cache_kwargs)
+    cache.set(key, value)
+    assert cache.get(key) == value
+
+    time.sleep(cache_kwargs["ttl"] * 2)
+    assert cache.get(key) is None
+    assert key not in cache
+
+    cache_info = cache.info()
+    assert cache_info.hits == expected_output["hits"]
+    assert cache_info.misses == expected_output["misses"]
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file", get_json_files(MODULE_EVENTS_DIR, ["ttl_cache", "lru"])
+)
+def test_02_ttl_cache(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    cache_kwargs: dict = get_event_as_dict["input"]["cache_kwargs"]
+    items: list[list] = get_event_as_dict["input"]["items"]
+    touch: str = get_event_as_dict["input"]["touch"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    cache = TTLCache(**cache_kwargs)
+    for key, value in items[:-1]:
+        cache.set(key, value)
+    cache.get(touch)
+    cache.set(*items[-1])
+
+    assert sorted(k for k, _ in items if k in cache) == expected_output["keys"]
+    cache_info = cache.info()
+    assert cache_info.evictions == expected_output["evictions"]
+    assert cache_info.bytes == expected_output["bytes"]
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file", get_json_files(MODULE_EVENTS_DIR, ["ttl_cache", "refresh"])
+)
+def test_03_ttl_cache(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    cache_kwargs: dict = get_event_as_dict["input"]["cache_kwargs"]
+    key: str = get_event_as_dict["input"]["key"]
+    values: list[str] = get_event_as_dict["input"]["values"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    cache = TTLCache(**cache_kwargs)
+    loads = iter(values)
+    assert cache.get_or_load(key, lambda: next(loads)) == values[0]
+
+    time.sleep(cache_kwargs["ttl"] * cache_kwargs["refresh_ahead"])
+    stale_value = cache.get_or_load(key, lambda: next(loads))
+    assert stale_value == expected_output["stale_value"]
+
+    deadline = time.monotonic() + cache_kwargs["ttl"]
+    while cache.info().refreshes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get(key) == expected_output["refreshed_value"]
+    assert cache.info().refreshes == expected_output["refreshes"]
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["single_flight", "coalesce"]),
+)
+def test_04_single_flight(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    key: str = get_event_as_dict["input"]["key"]
+    threads: int = get_event_as_dict["input"]["threads"]
+    delay: float = get_event_as_dict["input"]["delay"]
+    value: str = get_event_as_dict["input"]["value"]
+    exception = eval(get_event_as_dict["input"]["exception"])
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    flight = SingleFlight()
+    calls = []
+    started = threading.Barrier(threads)
+
+    def _fun():
+        calls.append(key)
+        time.sleep(delay)
+        return value
+
+    def _raise():
+        calls.append(key)
+        time.sleep(delay)
+        raise exception(value)
+
+    def _call(fun):
+        started.wait()
+        return flight.do(key, fun)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(_call, [_fun] * threads))
+    assert results == [value] * threads
+    assert len(calls) == expected_output["calls"]
+
+    calls.clear()
+    started.reset()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(_call, _raise) for _ in range(threads)]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        assert isinstance(error, exception)
+        assert str(error) == value
+    # every caller raises its own exception, not one shared traceback
+    assert len({id(error) for error in errors}) == threads
+    assert len(calls) == expected_output["calls"]
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["shared_file_cache", "coalesce"]),
+)
+def test_05_shared_file_cache(get_event_as_dict, tmp_path):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    key = tuple(get_event_as_dict["input"]["key"])
+    workers: int = get_event_as_dict["input"]["workers"]
+    delay: float = get_event_as_dict["input"]["delay"]
+    value = tuple(get_event_as_dict["input"]["value"])
+    ttl: float = get_event_as_dict["input"]["ttl"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # each worker stands in for a process with its own caches and files
+    caches = [
+        TTLCache(
+            ttl=ttl,
+            refresh_ahead=1,
+            shared=SharedFileCache(str(tmp_path), encrypt=False),
+            decode=tuple,
+        )
+        for _ in range(workers)
+    ]
+    calls = []
+    started = threading.Barrier(workers)
+
+    def _loader():
+        calls.append(key)
+        time.sleep(delay)
+        return value
+
+    def _call(cache):
+        started.wait()
+        return cache.get_or_load(key, _loader)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_call, caches))
+    assert results == [value] * workers
+    assert len(calls) == expected_output["calls"]
+
+    # a fresh worker is served from the shared cache
+    shared = SharedFileCache(str(tmp_path), encrypt=False)
+    assert tuple(shared.get(key)) == value
+    cache = TTLCache(ttl=ttl, shared=shared, decode=tuple)
+    assert cache.get(key) == value
+
+    # shared entries expire and are removed
+    time.sleep(ttl)
+    assert shared.get(key) is None
+    assert not shared.invalidate(key)
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["shared_file_cache", "encrypt"]),
+)
+def test_06_shared_file_cache(get_event_as_dict, tmp_path, monkeypatch):
+    pytest.importorskip("cryptography")
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    key = tuple(get_event_as_dict["input"]["key"])
+    value = list(get_event_as_dict["input"]["value"])
+    ttl: float = get_event_as_dict["input"]["ttl"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # the parent process hands the key to its workers via the environment
+    env_key = SharedFileCache.generate_key().decode()
+    monkeypatch.setenv(SharedFileCache.KEY_ENV, env_key)
+    writer = SharedFileCache(str(tmp_path))
+    writer.set(key, value, ttl)
+    assert SharedFileCache(str(tmp_path)).get(key) == value
+
+    # entries are encrypted at rest and the key never touches disk
+    for name in os.listdir(writer.directory):
+        with open(os.path.join(writer.directory, name), "rb") as f:
+            assert value[0].encode() not in f.read()
+    key_files = [
+        name
+        for name in os.listdir(tmp_path)
+        if name == SharedFileCache.KEY_FILE
+    ]
+    assert key_files == expected_output["key_files"]
+
+    # a cache holding a different key cannot read the entry
+    other = SharedFileCache(str(tmp_path), key=SharedFileCache.generate_key())
+    assert other.get(key) is None
+
+    # a key is only stored on disk when asked for
+    monkeypatch.delenv(SharedFileCache.KEY_ENV)
+    with pytest.raises(ValueError):
+        SharedFileCache(str(tmp_path))
+    SharedFileCache(str(tmp_path), key_on_disk=True)
+    assert SharedFileCache.KEY_FILE in os.listdir(tmp_path)
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file", get_json_files(MODULE_EVENTS_DIR, ["ttl_cache", "derive"])
+)
+def test_07_ttl_cache(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    cache_kwargs: dict = get_event_as_dict["input"]["cache_kwargs"]
+    key: str = get_event_as_dict["input"]["key"]
+    value: str = get_event_as_dict["input"]["value"]
+    derived_bytes: int = get_event_as_dict["input"]["derived_bytes"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    calls = []
+
+    def _parse(v):
+        calls.append(v)
+        return json.loads(v)
+
+    def _size(v):
+        return derived_bytes
+
+    cache = TTLCache(sizeof=_size, **cache_kwargs)
+    cache.set(key, value)
+    cached = cache.get(key)
+    derived = cache.derive(key, cached, _parse, sizeof=_size)
+    assert derived == expected_output["derived"]
+    assert cache.derive(key, cached, _parse, sizeof=_size) is derived
+    assert len(calls) == expected_output["calls"]
+    assert cache.info().bytes == expected_output["bytes"]
+
+    # once the entry is gone the derived value is no longer kept
+    cache.invalidate(key)
+    assert cache.info().bytes == 0
+    cache.derive(key, cached, _parse, sizeof=_size)
+    cache.derive(key, cached, _parse, sizeof=_size)
+    assert len(calls) == expected_output["calls_after_invalidate"]
@@ -3,6 +3,7 @@ import os
 import sys
 
 from botocore import exceptions as botoexceptions  # noqa: F401
+from botocore.config import Config
 import pytest
 
 from topshelfsoftware_aws_util.client import logger as client_logger
@@ -29,7 +30,12 @@ add_log_stream(client_logger, level=logging.DEBUG, stream=sys.stdout)
 # ----------------------------------------------------------------------------#
 from topshelfsoftware_aws_util.client import (  # noqa: E402
     BaseClient,
+    LazyClient,
+    clear_client_cache,
     create_boto3_client,
+    get_client_cache_info,
+    set_default_client_config,
+    transport_config,
 )
 
 
@@ -65,3 +71,74 @@ def test_02_create_boto3_client(get_event_as_dict):
 
     with pytest.raises(eval(exception)):
         create_boto3_client(service_name, region)
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["create_boto3_client", "cache"]),
+)
+def test_03_create_boto3_client(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    service_name: str = get_event_as_dict["input"]["service_name"]
+    region: str = get_event_as_dict["input"]["region"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    clear_client_cache()
+    client = create_boto3_client(service_name, region)
+    assert create_boto3_client(service_name, region) is client
+
+    cache_info = get_client_cache_info()
+    assert cache_info.hits == expected_output["hits"]
+    assert cache_info.misses == expected_output["misses"]
+
+    clear_client_cache(service_name)
+    assert create_boto3_client(service_name, region) is not client
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["lazy_client", "client"]),
+)
+def test_04_lazy_client(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    service_name: str = get_event_as_dict["input"]["service_name"]
+
+    lazy_client = LazyClient(service_name)
+    assert "deferred" in repr(lazy_client)
+
+    assert lazy_client.meta.service_model.service_name == service_name
+    assert isinstance(lazy_client.get_client(), BaseClient)
+    assert "created" in repr(lazy_client)
+
+    clear_client_cache(service_name)
+    assert "deferred" in repr(lazy_client)
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["transport_config", "client"]),
+)
+def test_05_transport_config(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    service_name: str = get_event_as_dict["input"]["service_name"]
+    config_kwargs: dict = get_event_as_dict["input"]["transport_config"]
+    config_override: dict = get_event_as_dict["input"]["config_override"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    lazy_client = LazyClient(service_name, config=Config(**config_override))
+    try:
+        set_default_client_config(transport_config(**config_kwargs))
+        client_config = lazy_client.meta.config
+        for opt, val in expected_output.items():
+            assert getattr(client_config, opt) == val
+    finally:
+        set_default_client_config(None)
@@ -0,0 +1,170 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import os
+import sys
+import threading
+from urllib.parse import parse_qsl, urlsplit
+
+from botocore.stub import Stubber
+import pytest
+
+from topshelfsoftware_aws_util.extension import logger as extension_logger
+from topshelfsoftware_logging import add_log_stream, get_logger
+
+from conftest import get_json_files, print_section_break
+
+# ----------------------------------------------------------------------------#
+#                               --- Globals ---                               #
+# ----------------------------------------------------------------------------#
+from __setup__ import TEST_EVENTS_PATH
+
+MODULE = "extension"
+MODULE_EVENTS_DIR = os.path.join(TEST_EVENTS_PATH, MODULE)
+
+# ----------------------------------------------------------------------------#
+#                               --- Logging ---                               #
+# ----------------------------------------------------------------------------#
+logger = get_logger(f"test_{MODULE}", stream=sys.stdout)
+add_log_stream(extension_logger, level=logging.DEBUG, stream=sys.stdout)
+
+# ----------------------------------------------------------------------------#
+#                           --- Module Imports ---                            #
+# ----------------------------------------------------------------------------#
+from topshelfsoftware_aws_util.extension import (  # noqa: E402
+    EXTENSION_PORT_ENV_VAR,
+    SESSION_TOKEN_HEADER,
+    Backend,
+    get_parameter_from_extension,
+    get_secret_from_extension,
+)
+from topshelfsoftware_aws_util.secrets import (  # noqa: E402
+    SecretStage,
+    get_secret_value,
+    secret_client,
+    set_secret_backend,
+)
+from topshelfsoftware_aws_util.ssm import (  # noqa: E402
+    get_ssm_value,
+    set_ssm_backend,
+)
+
+
+# ----------------------------------------------------------------------------#
+#                               --- Fixtures ---                              #
+# ----------------------------------------------------------------------------#
+@pytest.fixture
+def extension_server(get_event_as_dict, monkeypatch):
+    """Serve the event routes from a local stand-in for the extension."""
+    token: str = get_event_as_dict["input"]["session_token"]
+    routes: list[dict] = get_event_as_dict["input"]["routes"]
+    requests = []
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            requests.append(self.path)
+            route = next(
+                (
+                    r
+                    for r in routes
+                    if r["path"] == url.path
+                    and r["query"] == dict(parse_qsl(url.query))
+                ),
+                None,
+            )
+            if self.headers.get(SESSION_TOKEN_HEADER) != token:
+                status, body = 401, {}
+            elif route is None:
+                status, body = 404, {}
+            else:
+                status, body = route["status"], route["body"]
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("localhost", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("AWS_SESSION_TOKEN", token)
+    monkeypatch.setenv(EXTENSION_PORT_ENV_VAR, str(server.server_port))
+    try:
+        yield requests
+    finally:
+        server.shutdown()
+        server.server_close()
+        set_secret_backend(Backend.BOTO3)
+        set_ssm_backend(Backend.BOTO3)
+
+
+# ----------------------------------------------------------------------------#
+#                                --- TESTS ---                                #
+# ----------------------------------------------------------------------------#
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_from_extension", "resp"]),
+)
+def test_01_get_from_extension(get_event_as_dict, extension_server):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    secret_query: dict = get_event_as_dict["input"]["routes"][0]["query"]
+    ssm_query: dict = get_event_as_dict["input"]["routes"][1]["query"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    secret_resp = get_secret_from_extension(secret_query["secretId"])
+    assert secret_resp["SecretString"] == expected_output["secret_value"]
+    ssm_resp = get_parameter_from_extension(ssm_query["name"], True)
+    assert ssm_resp["Parameter"]["Value"] == expected_output["ssm_value"]
+
+    set_secret_backend(Backend.EXTENSION)
+    set_ssm_backend(Backend.EXTENSION)
+    secret = get_secret_value(secret_query["secretId"])
+    assert secret == expected_output["secret_value"]
+    val = get_ssm_value(ssm_query["name"], with_decryption=True)
+    assert val == expected_output["ssm_value"]
+
+    # staging labels passed as the enum are sent by value
+    secret = get_secret_value(
+        secret_query["secretId"], version_stage=SecretStage.PREVIOUS
+    )
+    assert secret == expected_output["previous_secret_value"]
+    assert len(extension_server) == expected_output["requests"]
+
+
+@pytest.mark.sad
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_from_extension", "fallback"]),
+)
+def test_02_get_from_extension(get_event_as_dict, extension_server):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_params: dict = get_event_as_dict["input"]["stub"]["parameters"]
+    stub_resp: dict = get_event_as_dict["input"]["stub"]["response"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(secret_client)
+    stubber.add_response(stub_method, stub_resp, stub_params)
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        set_secret_backend(Backend.EXTENSION)
+
+        # Test the source code
+        secret = get_secret_value(stub_params["SecretId"])
+        assert secret == expected_output["secret_value"]
+        assert len(extension_server) == expected_output["requests"]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import sys
@@ -29,8 +30,17 @@ add_log_stream(secrets_logger, level=logging.DEBUG, stream=sys.stdout)
 #                           --- Module Imports ---                            #
 # ----------------------------------------------------------------------------#
 from topshelfsoftware_aws_util.secrets import (  # noqa: E402
-    secret_client,
+    clear_secret_cache,
+    get_secret_json,
+    get_secret_key,
     get_secret_value,
+    get_secret_values,
+    get_secret_version,
+    invalidate_secret,
+    refresh_secret_if_rotated,
+    secret_cache,
+    secret_client,
+    SecretStage,
 )
 
 
@@ -130,3 +140,226 @@ def test_03_get_secret_value(get_event_as_dict):
     finally:
         # Deactivate the stubber
         stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_secret_value", "cache"]),
+)
+def test_04_get_secret_value(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_params: dict = get_event_as_dict["input"]["stub"]["parameters"]
+    stub_resp: dict = get_event_as_dict["input"]["stub"]["response"]
+    lookups: int = get_event_as_dict["input"]["lookups"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(secret_client)
+    stubber.add_response(stub_method, stub_resp, stub_params)
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        clear_secret_cache()
+
+        # Test the source code
+        for _ in range(lookups):
+            secret = get_secret_value(stub_params["SecretId"], use_cache=True)
+            assert secret == expected_output["secret_value"]
+        stubber.assert_no_pending_responses()
+
+        cache_info = secret_cache.info()
+        assert cache_info.hits == expected_output["hits"]
+        assert cache_info.misses == expected_output["misses"]
+
+        invalidate_secret(stub_params["SecretId"])
+        assert stub_params["SecretId"] not in secret_cache
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_secret_values", "resp"]),
+)
+def test_05_get_secret_values(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    secret_ids: list[str] = get_event_as_dict["input"]["secret_ids"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(secret_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_method, stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        clear_secret_cache()
+
+        # Test the source code
+        values, errors = get_secret_values(secret_ids)
+        assert values == expected_output["values"]
+        assert list(errors) == expected_output["errors"]
+        stubber.assert_no_pending_responses()
+
+        # batch results are served from the cache
+        for secret_id, secret in expected_output["values"].items():
+            assert get_secret_value(secret_id, use_cache=True) == secret
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_secret_json", "resp"]),
+)
+def test_06_get_secret_json(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_params: dict = get_event_as_dict["input"]["stub"]["parameters"]
+    stub_resp: dict = get_event_as_dict["input"]["stub"]["response"]
+    key: str = get_event_as_dict["input"]["key"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+    secret_id = stub_params["SecretId"]
+
+    # Stub the boto3 client
+    stubber = Stubber(secret_client)
+    stubber.add_response(stub_method, stub_resp, stub_params)
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        clear_secret_cache()
+
+        # Test the source code
+        secret_json = get_secret_json(secret_id, use_cache=True)
+        assert json.loads(json.dumps(dict(secret_json))) == (
+            expected_output["secret_json"]
+        )
+        with pytest.raises(TypeError):
+            secret_json[key] = None
+
+        # parsed once and served from the memo while the raw value is cached
+        assert get_secret_json(secret_id, use_cache=True) is secret_json
+        assert get_secret_key(secret_id, key, use_cache=True) == (
+            expected_output["key_value"]
+        )
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["refresh_secret_if_rotated", "resp"]),
+)
+def test_07_refresh_secret_if_rotated(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    secret_id: str = get_event_as_dict["input"]["secret_id"]
+    stubs: list[dict] = get_event_as_dict["input"]["stubs"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(secret_client)
+    for stub in stubs:
+        stubber.add_response(
+            stub["method"], stub["response"], stub["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        clear_secret_cache()
+
+        # Test the source code
+        secret = get_secret_value(secret_id, use_cache=True)
+        assert secret == expected_output["secret_values"][0]
+        for i, refreshed in enumerate(expected_output["refreshed"]):
+            assert refresh_secret_if_rotated(secret_id) == refreshed
+            version = get_secret_version(secret_id)
+            assert version.version_id == expected_output["version_ids"][i]
+            assert get_secret_value(secret_id, use_cache=True) == (
+                expected_output["secret_values"][i]
+            )
+
+        # previous versions are cached separately from the current version
+        secret = get_secret_value(
+            secret_id, use_cache=True, version_stage=SecretStage.PREVIOUS
+        )
+        assert secret == expected_output["secret_values"][0]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(
+        MODULE_EVENTS_DIR, ["refresh_secret_if_rotated", "uncached"]
+    ),
+)
+def test_08_refresh_secret_after_uncached_read(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    secret_id: str = get_event_as_dict["input"]["secret_id"]
+    stubs: list[dict] = get_event_as_dict["input"]["stubs"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(secret_client)
+    for stub in stubs:
+        stubber.add_response(
+            stub["method"], stub["response"], stub["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        clear_secret_cache()
+
+        # Test the source code
+        secret = get_secret_value(secret_id, use_cache=True)
+        assert secret == expected_output["cached_before"]
+
+        # the secret rotates and is read elsewhere without the cache
+        assert get_secret_value(secret_id) == expected_output["uncached"]
+        assert get_secret_value(secret_id, use_cache=True) == (
+            expected_output["cached_before"]
+        )
+
+        refreshed = refresh_secret_if_rotated(secret_id)
+        assert refreshed == expected_output["refreshed"]
+        assert get_secret_version(secret_id).version_id == (
+            expected_output["version_id"]
+        )
+        assert get_secret_value(secret_id, use_cache=True) == (
+            expected_output["cached_after"]
+        )
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
@@ -1,8 +1,13 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import io
 import json
 import logging
 import os
 import sys
+import time
 
+from botocore.response import StreamingBody
 from botocore.stub import Stubber
 import pytest
 
@@ -38,9 +43,27 @@ add_log_stream(common_logger, level=logging.DEBUG, stream=sys.stdout)
 # ----------------------------------------------------------------------------#
 from topshelfsoftware_aws_util.sfn import (  # noqa: E402
     sfn_client,
+    sfn_sync_client,
+    s3_client,
+    sqs_client,
+    DurationTracker,
+    ExecutionStats,
+    SfnEventWaiter,
+    alaunch_sfn,
+    apoll_sfn,
+    execution_name,
+    get_sfn_output,
     launch_sfn,
+    launch_sfn_batch,
     poll_sfn,
+    poll_sfn_adaptive,
+    put_claim_check,
+    run_sfn_sync,
     get_exec_hist,
+    iter_exec_hist,
+    iter_executions,
+    tail_exec_hist,
+    watch_sfns,
 )
 
 
@@ -145,3 +168,668 @@ def test_03_get_exec_hist(get_event_as_dict):
     finally:
         # Deactivate the stubber
         stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["launch_sfn_batch", "resp"]),
+)
+def test_04_launch_sfn_batch(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    state_machine_arn: str = get_event_as_dict["input"]["state_machine_arn"]
+    payloads: list[dict] = get_event_as_dict["input"]["payloads"]
+    name_prefix: str = get_event_as_dict["input"]["name_prefix"]
+    rate: float = get_event_as_dict["input"]["rate"]
+    max_workers: int = get_event_as_dict["input"]["max_workers"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        if "error" in stub_call:
+            stubber.add_client_error(
+                stub_method,
+                service_error_code=stub_call["error"],
+                expected_params=stub_call["parameters"],
+            )
+        else:
+            stubber.add_response(
+                stub_method, stub_call["response"], stub_call["parameters"]
+            )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        results = {}
+        for name, result in launch_sfn_batch(
+            state_machine_arn,
+            iter(payloads),
+            rate=rate,
+            max_workers=max_workers,
+            name_fun=lambda p: execution_name(p, name_prefix),
+        ):
+            if isinstance(result, Exception):
+                result = result.response["Error"]["Code"]
+            results[name] = result
+        assert results == expected_output["results"]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["watch_sfns", "resp"]),
+)
+def test_05_watch_sfns(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    execution_arns: list[str] = get_event_as_dict["input"]["execution_arns"]
+    watch_kwargs: dict = get_event_as_dict["input"]["watch_kwargs"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        if "error" in stub_call:
+            stubber.add_client_error(
+                stub_method,
+                service_error_code=stub_call["error"],
+                expected_params=stub_call["parameters"],
+            )
+        else:
+            stubber.add_response(
+                stub_method, stub_call["response"], stub_call["parameters"]
+            )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        statuses = {
+            res["executionArn"]: res["status"]
+            for res in watch_sfns(execution_arns, **watch_kwargs)
+        }
+        assert statuses == expected_output["statuses"]
+        assert list(statuses) == list(expected_output["statuses"])
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["apoll_sfn"]),
+)
+def test_06_apoll_sfn(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    state_machine_arn: str = get_event_as_dict["input"]["state_machine_arn"]
+    payload: dict = get_event_as_dict["input"]["payload"]
+    name: str = get_event_as_dict["input"]["name"]
+    poll_kwargs: dict = get_event_as_dict["input"]["poll_kwargs"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_call["method"], stub_call["response"], stub_call["parameters"]
+        )
+
+    async def _launch_and_poll():
+        limiter = asyncio.Semaphore(1)
+        execution_arn = await alaunch_sfn(
+            state_machine_arn, payload, name, limiter=limiter
+        )
+        return await apoll_sfn(execution_arn, limiter=limiter, **poll_kwargs)
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        sfn_resp = asyncio.run(_launch_and_poll())
+        assert sfn_resp == expected_output
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["iter_exec_hist", "resp"]),
+)
+def test_07_iter_exec_hist(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    execution_arn: str = get_event_as_dict["input"]["execution_arn"]
+    iter_kwargs: dict = get_event_as_dict["input"]["iter_kwargs"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_method, stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        events = list(iter_exec_hist(execution_arn, **iter_kwargs))
+        assert events == expected_output["events"]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["tail_exec_hist", "resp"]),
+)
+def test_08_tail_exec_hist(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    execution_arn: str = get_event_as_dict["input"]["execution_arn"]
+    tail_kwargs: dict = get_event_as_dict["input"]["tail_kwargs"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client, calls default to the stub method
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_call.get("method", stub_method),
+            stub_call["response"],
+            stub_call["parameters"],
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        events = list(tail_exec_hist(execution_arn, **tail_kwargs))
+        assert events == expected_output["events"]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["run_sfn_sync"]),
+)
+def test_09_run_sfn_sync(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    state_machine_arn: str = get_event_as_dict["input"]["state_machine_arn"]
+    payload: dict = get_event_as_dict["input"]["payload"]
+    name: str = get_event_as_dict["input"]["name"]
+    poll_kwargs: dict = get_event_as_dict["input"]["poll_kwargs"]
+    poll_kwargs["step_fun"] = eval(poll_kwargs["step_fun"])
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 clients, synchronous runs use their own client
+    stubber = Stubber(sfn_client)
+    sync_stubber = Stubber(sfn_sync_client)
+    for stub_call in stub_calls:
+        if stub_call["method"] == "start_sync_execution":
+            call_stubber = sync_stubber
+        else:
+            call_stubber = stubber
+        if "error" in stub_call:
+            call_stubber.add_client_error(
+                stub_call["method"],
+                service_error_code=stub_call["error"],
+                expected_params=stub_call["parameters"],
+            )
+        else:
+            call_stubber.add_response(
+                stub_call["method"],
+                stub_call["response"],
+                stub_call["parameters"],
+            )
+
+    try:
+        # Activate the stubbers
+        stubber.activate()
+        sync_stubber.activate()
+
+        # Test the source code
+        sfn_resp = run_sfn_sync(
+            state_machine_arn, payload, name, poll_kwargs=poll_kwargs
+        )
+        assert sfn_resp == expected_output["response"]
+        assert get_sfn_output(sfn_resp) == expected_output["output"]
+        stubber.assert_no_pending_responses()
+        sync_stubber.assert_no_pending_responses()
+        assert sfn_sync_client.meta.config.retries["total_max_attempts"] == 1
+    finally:
+        # Deactivate the stubbers
+        stubber.deactivate()
+        sync_stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["poll_sfn_adaptive"]),
+)
+def test_10_poll_sfn_adaptive(get_event_as_dict, tmp_path, monkeypatch):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    recorded: dict = get_event_as_dict["input"]["recorded"]
+    duration: float = get_event_as_dict["input"]["duration"]
+    poll_kwargs: dict = get_event_as_dict["input"]["poll_kwargs"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_params: dict = get_event_as_dict["input"]["stub"]["parameters"]
+    stub_resps: list[dict] = get_event_as_dict["input"]["stub"]["responses"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # seed the durations observed for the state machine
+    path = str(tmp_path / "durations.json")
+    tracker = DurationTracker(path=path)
+    for state_machine_arn, durations in recorded.items():
+        for d in durations:
+            tracker.record(state_machine_arn, d)
+
+    # the execution starts now and runs for the given duration
+    start_date = datetime.now(timezone.utc)
+    stop_date = start_date + timedelta(seconds=duration)
+
+    # record the step function of each polling phase
+    step_funs = []
+
+    def _poll_sfn(execution_arn, step_fun, **kwargs):
+        step_funs.append(step_fun.__name__)
+        return poll_sfn(execution_arn, step_fun=step_fun, **kwargs)
+
+    monkeypatch.setattr("topshelfsoftware_aws_util.sfn.poll_sfn", _poll_sfn)
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_resp in stub_resps:
+        stub_resp["startDate"] = start_date
+        if "stopDate" in stub_resp:
+            stub_resp["stopDate"] = stop_date
+        stubber.add_response(stub_method, stub_resp, stub_params)
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        start = time.monotonic()
+        sfn_resp = poll_sfn_adaptive(
+            stub_params["executionArn"], tracker=tracker, **poll_kwargs
+        )
+        assert time.monotonic() - start >= expected_output["min_elapsed"]
+        assert sfn_resp["status"] == expected_output["status"]
+        assert step_funs == expected_output["step_funs"]
+        stubber.assert_no_pending_responses()
+
+        # the new duration is recorded and persisted
+        with open(path) as f:
+            assert json.load(f)[sfn_resp["stateMachineArn"]] == pytest.approx(
+                expected_output["durations"]
+            )
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["sfn_event_waiter", "resp"]),
+)
+def test_11_sfn_event_waiter(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    queue_url: str = get_event_as_dict["input"]["queue_url"]
+    execution_arns: list[str] = get_event_as_dict["input"]["execution_arns"]
+    waiter_kwargs: dict = get_event_as_dict["input"]["waiter_kwargs"]
+    stubs: dict = get_event_as_dict["input"]["stubs"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 clients
+    stubbers = {
+        "sqs": Stubber(sqs_client),
+        "stepfunctions": Stubber(sfn_client),
+    }
+    for service, stub_calls in stubs.items():
+        for stub_call in stub_calls:
+            stubbers[service].add_response(
+                stub_call["method"],
+                stub_call["response"],
+                stub_call["parameters"],
+            )
+
+    try:
+        # Activate the stubbers
+        for stubber in stubbers.values():
+            stubber.activate()
+
+        # Test the source code
+        waiter = SfnEventWaiter(queue_url, **waiter_kwargs)
+        futures = {arn: waiter.register(arn) for arn in execution_arns}
+        assert waiter.poll_once() == expected_output["resolved"]
+        statuses = {
+            arn: future.result(timeout=0)["status"]
+            for arn, future in futures.items()
+        }
+        assert statuses == expected_output["statuses"]
+        for arn, stop_date in expected_output["stop_dates"].items():
+            res = futures[arn].result(timeout=0)
+            assert res["stopDate"].isoformat() == stop_date
+            assert isinstance(res["startDate"], datetime)
+        for stubber in stubbers.values():
+            stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubbers
+        for stubber in stubbers.values():
+            stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["claim_check", "resp"]),
+)
+def test_12_claim_check(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    state_machine_arn: str = get_event_as_dict["input"]["state_machine_arn"]
+    payload: dict = get_event_as_dict["input"]["payload"]
+    name: str = get_event_as_dict["input"]["name"]
+    launch_kwargs: dict = get_event_as_dict["input"]["launch_kwargs"]
+    stubs: dict = get_event_as_dict["input"]["stubs"]
+    sfn_response: dict = get_event_as_dict["input"]["sfn_response"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 clients
+    stubbers = {"s3": Stubber(s3_client), "stepfunctions": Stubber(sfn_client)}
+    for service, stub_calls in stubs.items():
+        for stub_call in stub_calls:
+            params = dict(stub_call["parameters"])
+            resp = dict(stub_call["response"])
+            if "body" in stub_call:
+                data = json.dumps(stub_call["body"]).encode()
+                if stub_call["method"] == "put_object":
+                    params["Body"] = data
+                else:
+                    resp["Body"] = StreamingBody(io.BytesIO(data), len(data))
+            stubbers[service].add_response(stub_call["method"], resp, params)
+
+    try:
+        # Activate the stubbers
+        for stubber in stubbers.values():
+            stubber.activate()
+
+        # Test the source code
+        execution_arn = launch_sfn(
+            state_machine_arn, payload, name, **launch_kwargs
+        )
+        assert execution_arn == expected_output["execution_arn"]
+        output = get_sfn_output(sfn_response, resolve=True)
+        assert output == expected_output["output"]
+        for stubber in stubbers.values():
+            stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubbers
+        for stubber in stubbers.values():
+            stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["iter_executions", "resp"]),
+)
+def test_13_iter_executions(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    state_machine_arn: str = get_event_as_dict["input"]["state_machine_arn"]
+    page_size: int = get_event_as_dict["input"]["page_size"]
+    status_filter: str = get_event_as_dict["input"].get("status_filter")
+    window: float = get_event_as_dict["input"]["window"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        for execution in stub_call["response"]["executions"]:
+            for k in ("startDate", "stopDate"):
+                if k in execution:
+                    execution[k] = datetime.fromisoformat(execution[k])
+        stubber.add_response(
+            stub_method, stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        stats = ExecutionStats(window=window)
+        names = []
+        for execution in iter_executions(
+            state_machine_arn, status_filter=status_filter, page_size=page_size
+        ):
+            names.append(execution["name"])
+            stats.add(execution)
+        assert names == expected_output["names"]
+        assert {
+            k.value: v for k, v in stats.counts.items() if v
+        } == expected_output["counts"]
+        for q, duration in expected_output["percentiles"].items():
+            assert stats.percentile(float(q)) == duration
+        assert [
+            [start.isoformat(), *rest]
+            for start, *rest in stats.failure_rates()
+        ] == expected_output["failure_rates"]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.sad
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["sfn_event_waiter", "pending_redrive"]),
+)
+def test_14_sfn_event_waiter(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    queue_url: str = get_event_as_dict["input"]["queue_url"]
+    execution_arns: list[str] = get_event_as_dict["input"]["execution_arns"]
+    waiter_kwargs: dict = get_event_as_dict["input"]["waiter_kwargs"]
+    stubs: dict = get_event_as_dict["input"]["stubs"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(sqs_client)
+    for stub_call in stubs["sqs"]:
+        stubber.add_response(
+            stub_call["method"], stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        waiter = SfnEventWaiter(queue_url, **waiter_kwargs)
+        futures = {arn: waiter.register(arn) for arn in execution_arns}
+        assert waiter.poll_once() == expected_output["resolved"]
+        pending = [arn for arn, future in futures.items() if not future.done()]
+        assert pending == expected_output["pending"]
+        stubber.assert_no_pending_responses()
+
+        # executions concluded before registering resolve immediately
+        for arn, status in expected_output["late_statuses"].items():
+            assert waiter.register(arn).result(timeout=0)["status"] == status
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.sad
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["launch_sfn_batch", "unserializable"]),
+)
+def test_15_launch_sfn_batch(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    state_machine_arn: str = get_event_as_dict["input"]["state_machine_arn"]
+    payloads: list[dict] = get_event_as_dict["input"]["payloads"]
+    n_bad: int = get_event_as_dict["input"]["unserializable_payloads"]
+    name_prefix: str = get_event_as_dict["input"]["name_prefix"]
+    long_name_prefix: str = get_event_as_dict["input"]["long_name_prefix"]
+    rate: float = get_event_as_dict["input"]["rate"]
+    max_workers: int = get_event_as_dict["input"]["max_workers"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # bytes cannot be serialized to JSON
+    payloads = [*payloads, *[{"id": b"bytes"} for _ in range(n_bad)]]
+
+    # Stub the boto3 client
+    stubber = Stubber(sfn_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_method, stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        results = []
+        for name, result in launch_sfn_batch(
+            state_machine_arn,
+            iter(payloads),
+            rate=rate,
+            max_workers=max_workers,
+            name_fun=lambda p: execution_name(p, name_prefix),
+        ):
+            if isinstance(result, Exception):
+                result = type(result).__name__
+            results.append([name, result])
+        assert sorted(results, key=str) == sorted(
+            expected_output["results"], key=str
+        )
+        stubber.assert_no_pending_responses()
+
+        # a prefix leaving too little of the digest is rejected
+        with pytest.raises(ValueError):
+            execution_name(payloads[0], long_name_prefix)
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["put_claim_check", "multipart"]),
+)
+def test_16_put_claim_check(get_event_as_dict, monkeypatch):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    payload: dict = get_event_as_dict["input"]["payload"]
+    bucket: str = get_event_as_dict["input"]["bucket"]
+    key: str = get_event_as_dict["input"]["key"]
+    threshold: int = get_event_as_dict["input"]["multipart_threshold"]
+    stubs: list[dict] = get_event_as_dict["input"]["stubs"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+    data = json.dumps(payload).encode()
+    assert len(data) > threshold
+
+    # record the parameters of each call, as the transfer manager adds
+    # checksum parameters that depend on the botocore version
+    calls = []
+    uploaded = []
+
+    def _record(params, model, **kwargs):
+        calls.append((model.name, params))
+        if "Body" in params:
+            uploaded.append(params["Body"].read())
+            params["Body"].seek(0)
+
+    monkeypatch.setattr(
+        "topshelfsoftware_aws_util.sfn.MULTIPART_THRESHOLD", threshold
+    )
+    s3_client.meta.events.register("before-parameter-build.s3.*", _record)
+
+    # Stub the boto3 client
+    stubber = Stubber(s3_client)
+    for stub_call in stubs:
+        stubber.add_response(stub_call["method"], stub_call["response"])
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        ref = put_claim_check(data, bucket, key)
+        assert ref == expected_output["reference"]
+        assert len(calls) == len(stubs)
+        for (_, params), stub_call in zip(calls, stubs):
+            for k, v in stub_call["parameters"].items():
+                assert params[k] == v
+        assert b"".join(uploaded) == data
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+        s3_client.meta.events.unregister(
+            "before-parameter-build.s3.*", _record
+        )
@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+from typing import Mapping
 
 import botocore  # noqa: F401
 from botocore.stub import Stubber
@@ -30,10 +31,29 @@ add_log_stream(ssm_logger, level=logging.DEBUG, stream=sys.stdout)
 # ----------------------------------------------------------------------------#
 from topshelfsoftware_aws_util.ssm import (  # noqa: E402
     ssm_client,
+    SsmSnapshot,
+    clear_ssm_cache,
+    get_ssm_typed,
     get_ssm_value,
+    get_ssm_values,
+    iter_ssm_path,
+    load_ssm_tree,
+    ssm_negative_cache,
 )
 
 
+# ----------------------------------------------------------------------------#
+#                               --- Helpers ---                               #
+# ----------------------------------------------------------------------------#
+def _thaw(obj):
+    """Convert read-only containers back into JSON-compatible types."""
+    if isinstance(obj, Mapping):
+        return {k: _thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_thaw(v) for v in obj]
+    return obj
+
+
 # ----------------------------------------------------------------------------#
 #                                --- TESTS ---                                #
 # ----------------------------------------------------------------------------#
@@ -130,3 +150,194 @@ def test_03_get_ssm_value(get_event_as_dict):
     finally:
         # Deactivate the stubber
         stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_ssm_values", "resp"]),
+)
+def test_04_get_ssm_values(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    names: list[str] = get_event_as_dict["input"]["names"]
+    with_decryption: bool = get_event_as_dict["input"]["with_decryption"]
+    max_workers: int = get_event_as_dict["input"]["max_workers"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(ssm_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_method, stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        values, invalid = get_ssm_values(names, with_decryption, max_workers)
+        assert values == expected_output["values"]
+        assert invalid == expected_output["invalid"]
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["load_ssm_tree", "resp"]),
+)
+def test_05_load_ssm_tree(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    path: str = get_event_as_dict["input"]["path"]
+    recursive: bool = get_event_as_dict["input"]["recursive"]
+    with_decryption: bool = get_event_as_dict["input"]["with_decryption"]
+    page_size: int = get_event_as_dict["input"]["page_size"]
+    stub_method: str = get_event_as_dict["input"]["stub"]["method"]
+    stub_calls: list[dict] = get_event_as_dict["input"]["stub"]["calls"]
+    expected_output: dict = get_event_as_dict["expected_output"]
+
+    # Stub the boto3 client
+    stubber = Stubber(ssm_client)
+    for stub_call in stub_calls:
+        stubber.add_response(
+            stub_method, stub_call["response"], stub_call["parameters"]
+        )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+
+        # Test the source code
+        tree = load_ssm_tree(path, recursive, with_decryption, page_size)
+        assert tree == expected_output["tree"]
+        stubber.assert_no_pending_responses()
+
+        # pages are only requested as they are consumed
+        stubber.add_response(
+            stub_method, stub_calls[0]["response"], stub_calls[0]["parameters"]
+        )
+        params = iter_ssm_path(path, recursive, with_decryption, page_size)
+        for _ in range(page_size):
+            next(params)
+        params.close()
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["ssm_snapshot", "refresh"]),
+)
+def test_06_ssm_snapshot(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    path: str = get_event_as_dict["input"]["path"]
+    refreshes: list[dict] = get_event_as_dict["input"]["refreshes"]
+
+    snapshot = SsmSnapshot(path)
+    for refresh in refreshes:
+        expected_output: dict = refresh["expected_output"]
+
+        # Stub the boto3 client
+        stubber = Stubber(ssm_client)
+        for stub in refresh["stubs"]:
+            stubber.add_response(
+                stub["method"], stub["response"], stub["parameters"]
+            )
+
+        try:
+            # Activate the stubber
+            stubber.activate()
+
+            # Test the source code
+            previous = snapshot.values
+            changed, removed = snapshot.refresh()
+            assert changed == expected_output["changed"]
+            assert removed == expected_output["removed"]
+            assert dict(snapshot.values) == expected_output["values"]
+            if changed or removed:
+                assert snapshot.values is not previous
+            stubber.assert_no_pending_responses()
+        finally:
+            # Deactivate the stubber
+            stubber.deactivate()
+
+
+@pytest.mark.happy
+@pytest.mark.parametrize("event_dir", [MODULE_EVENTS_DIR])
+@pytest.mark.parametrize(
+    "event_file",
+    get_json_files(MODULE_EVENTS_DIR, ["get_ssm_typed", "cache"]),
+)
+def test_07_get_ssm_typed(get_event_as_dict):
+    print_section_break()
+    logger.info(f"Test Description: {get_event_as_dict['description']}")
+    lookups: int = get_event_as_dict["input"]["lookups"]
+    typed: list[dict] = get_event_as_dict["input"]["typed"]
+    missing: dict = get_event_as_dict["input"]["missing"]
+    exception: str = missing["exception"]
+
+    # Stub the boto3 client
+    stubber = Stubber(ssm_client)
+    for param in typed:
+        stub: dict = param["stub"]
+        stubber.add_response(
+            stub["method"], stub["response"], stub["parameters"]
+        )
+    stub_resp: dict = missing["stub"]["response"]
+    stubber.add_client_error(
+        missing["stub"]["method"],
+        service_error_code=stub_resp["Error"]["Code"],
+        service_message=stub_resp["Error"]["Message"],
+        http_status_code=stub_resp["Error"]["HttpStatusCode"],
+        expected_params=missing["stub"]["parameters"],
+    )
+
+    try:
+        # Activate the stubber
+        stubber.activate()
+        clear_ssm_cache()
+
+        # Test the source code
+        for param in typed:
+            decoded = get_ssm_typed(
+                param["name"], as_json=param["as_json"], use_cache=True
+            )
+            assert _thaw(decoded) == param["expected"]
+            for _ in range(lookups - 1):
+                assert (
+                    get_ssm_typed(
+                        param["name"], as_json=param["as_json"], use_cache=True
+                    )
+                    is decoded
+                )
+
+        raised = []
+        for _ in range(lookups):
+            with pytest.raises(eval(exception)) as exc_info:
+                get_ssm_value(missing["name"], use_cache=True)
+            raised.append(exc_info.value)
+        assert len(ssm_negative_cache) == 1
+        # each cached miss raises a fresh exception with the same error
+        assert len({id(e) for e in raised}) == lookups
+        assert {e.response["Error"]["Code"] for e in raised} == {
+            stub_resp["Error"]["Code"]
+        }
+        stubber.assert_no_pending_responses()
+    finally:
+        # Deactivate the stubber
+        stubber.deactivate()
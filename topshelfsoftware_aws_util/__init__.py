@@ -1,13 +1,21 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import importlib
 import logging
-from typing import List, Union
-
-from topshelfsoftware_aws_util.client import logger as client_logger
-from topshelfsoftware_aws_util.secrets import logger as secrets_logger
-from topshelfsoftware_aws_util.sfn import logger as sfn_logger
-from topshelfsoftware_aws_util.ssm import logger as ssm_logger
+import time
+from typing import Callable, Dict, List, Optional, Union
 
 PACKAGE_NAME = "topshelfsoftware-aws-util"
 
+# submodules are imported on demand so that importing the package, or a
+# single module within it, does not pay for the others
+_MODULES = ("cache", "client", "extension", "secrets", "sfn", "ssm")
+
+PrefetchReport = namedtuple(
+    "PrefetchReport", ["elapsed", "timings", "loaded", "failures"]
+)
+
 
 def debug():
     """Set the package Loggers to the DEBUG level."""
@@ -15,12 +23,129 @@ def debug():
     return
 
 
+def prefetch(
+    manifest: Dict[str, List[str]],
+    max_workers: int = 8,
+    ttl: Optional[float] = None,
+) -> PrefetchReport:
+    """Warm the secret and SSM parameter caches during initialization.
+
+    The secrets and parameters declared in the manifest are retrieved
+    concurrently across both services and stored to `secret_cache` and
+    `ssm_cache`, so later lookups made with `use_cache=True` are served
+    from memory. Failures are reported rather than raised.
+
+    Parameters
+    ----------
+    manifest: dict[str, list[str]]
+        Declared dependencies, with any of the keys:
+        `secrets`, the ARNs or names of secrets;
+        `ssm_names`, the names of SSM parameters;
+        `ssm_paths`, SSM parameter hierarchies loaded recursively;
+        `with_decryption`, a `bool` applied to the SSM lookups (default
+        `False`, matching `get_ssm_value`). Parameters other than
+        SecureStrings are cached for lookups either way.
+
+    max_workers: int, optional
+        Maximum number of fetch tasks in flight at once. Each SSM path is
+        its own task.
+        Default is `8`.
+
+    ttl: float, optional
+        Time to live in seconds of the values stored to the caches.
+        Default of `None` uses the TTL of each cache.
+
+    Returns
+    -------
+    PrefetchReport
+        Named tuple of the total elapsed seconds, elapsed seconds keyed by
+        task, the number of values loaded and error messages keyed by the
+        secret, parameter or task that failed.
+    """
+    tasks = _prefetch_tasks(manifest, ttl)
+    timings: Dict[str, float] = {}
+    failures: Dict[str, str] = {}
+    loaded = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(_run_timed, tasks.values()))
+    for name, (result, error, elapsed) in zip(tasks, results):
+        timings[name] = elapsed
+        if error is not None:
+            failures[name] = str(error)
+            continue
+        values, errors = result
+        loaded += len(values)
+        failures.update(errors)
+    report = PrefetchReport(
+        time.perf_counter() - start, timings, loaded, failures
+    )
+    return report
+
+
 def get_package_loggers() -> List[logging.Logger]:
     """Retrieve a list of the Loggers used in the package."""
-    loggers = [client_logger, secrets_logger, sfn_logger, ssm_logger]
+    loggers = [
+        importlib.import_module(f"{__name__}.{module}").logger
+        for module in _MODULES
+    ]
     return loggers
 
 
+def _prefetch_tasks(
+    manifest: Dict[str, List[str]], ttl: Optional[float]
+) -> Dict[str, Callable[[], tuple]]:
+    """Build the prefetch tasks keyed by name. Each task returns the values
+    loaded and error messages keyed by the secret or parameter."""
+    secrets = importlib.import_module(f"{__name__}.secrets")
+    ssm = importlib.import_module(f"{__name__}.ssm")
+    with_decryption = manifest.get("with_decryption", False)
+
+    def _ssm_names():
+        values, invalid = ssm.get_ssm_values(
+            manifest["ssm_names"],
+            with_decryption,
+            populate_cache=True,
+            ttl=ttl,
+        )
+        return values, {name: "invalid parameter" for name in invalid}
+
+    def _ssm_path(path):
+        values = dict(
+            ssm.iter_ssm_path(
+                path,
+                with_decryption=with_decryption,
+                populate_cache=True,
+                ttl=ttl,
+            )
+        )
+        return values, {}
+
+    tasks = {}
+    if manifest.get("secrets"):
+        tasks["secrets"] = partial(
+            secrets.get_secret_values,
+            manifest["secrets"],
+            populate_cache=True,
+            ttl=ttl,
+        )
+    if manifest.get("ssm_names"):
+        tasks["ssm_names"] = _ssm_names
+    for path in manifest.get("ssm_paths", []):
+        tasks[f"ssm_path:{path}"] = partial(_ssm_path, path)
+    return tasks
+
+
+def _run_timed(fun: Callable[[], tuple]) -> tuple:
+    """Call a task, capturing its result or exception and elapsed time."""
+    start = time.perf_counter()
+    try:
+        result, error = fun(), None
+    except Exception as e:
+        result, error = None, e
+    return result, error, time.perf_counter() - start
+
+
 def _set_logger_levels(level: Union[int, str]):
     loggers = get_package_loggers()
     for logger in loggers:
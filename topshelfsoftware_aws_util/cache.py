@@ -0,0 +1,733 @@
+"""Facilitate in-memory caching of values retrieved from AWS."""
+
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+import copy
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from topshelfsoftware_logging import get_logger
+
+logger = get_logger(__name__, stream=None)
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    ["hits", "misses", "refreshes", "evictions", "entries", "bytes"],
+)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single call.
+
+    The first caller for a key runs the function; callers arriving while
+    it is in flight wait for it and receive its result, or its exception,
+    instead of making a duplicate call.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fun: Callable[[], Any]) -> Any:
+        """Call `fun`, or wait on the call already in flight for `key`.
+
+        Parameters
+        ----------
+        key: Hashable
+            Key identifying equivalent calls.
+
+        fun: Callable
+            Zero-argument function to call.
+
+        Returns
+        -------
+        Any
+            Result of the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            logger.debug(f"waiting on in-flight call: {key}")
+            return call.wait()
+
+        try:
+            call.result = fun()
+        except BaseException as e:
+            call.error = e
+            raise e
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            # each waiter raises its own copy, so concurrent raises do not
+            # all add their frames to the traceback of one shared exception
+            error = _copy_error(self.error)
+            if error is self.error:
+                raise error
+            raise error from self.error
+        return self.result
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "expires_at", "refresh_at", "derived")
+
+    def __init__(
+        self, value: Any, size: int, ttl: float, refresh_ahead: float
+    ):
+        now = time.monotonic()
+        self.value = value
+        self.size = size
+        self.expires_at = now + ttl
+        self.refresh_at = now + ttl * refresh_ahead
+        self.derived: Optional[Dict[Hashable, Any]] = None
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache with per-entry time to live.
+
+    Entries that are read after `refresh_ahead` of their TTL has elapsed
+    are served from the cache while a background thread reloads them, so
+    hot keys never block on a network round trip. Keys are logged; values
+    never are.
+
+    Parameters
+    ----------
+    ttl: float, optional
+        Default time to live of an entry in seconds.
+        Default is `300`.
+
+    max_entries: int, optional
+        Maximum number of entries held before the least recently used
+        entry is evicted.
+        Default is `1024`.
+
+    max_bytes: int, optional
+        Maximum combined size of the values held, as measured by `sizeof`.
+        Default of `None` means no limit on size.
+
+    refresh_ahead: float, optional
+        Fraction of the TTL after which a read triggers a background
+        refresh. A value of `1` or greater disables refresh-ahead.
+        Default is `0.8`.
+
+    sizeof: Callable, optional
+        Function measuring the size of a value in bytes.
+        Default measures the length of `str` and `bytes` values and uses
+        `sys.getsizeof` for anything else.
+
+    shared: SharedFileCache, optional
+        Cross-process cache consulted on a miss and written through on
+        every store, so one process's load serves every process on the
+        host. May also be assigned to the `shared` attribute later.
+        Default is `None`.
+
+    decode: Callable, optional
+        Function rebuilding a value read from `shared`, e.g. turning a
+        JSON array back into a named tuple.
+        Default of `None` uses the decoded JSON as is.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        refresh_ahead: float = 0.8,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        shared: Optional["SharedFileCache"] = None,
+        decode: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.refresh_ahead = refresh_ahead
+        self.shared = shared
+        self._sizeof = _sizeof if sizeof is None else sizeof
+        self._decode = decode
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing: set = set()
+        self._flight = SingleFlight()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self) -> List[Hashable]:
+        """Retrieve a snapshot of the keys in the cache, least recently
+        used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retrieve an unexpired value from the cache, or `default`."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._hits += 1
+                return entry.value
+            self._misses += 1
+        found = self._get_shared(key)
+        return default if found is None else found[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value in the cache, evicting entries if needed.
+        The value is written through to the shared cache, if any."""
+        ttl = self.ttl if ttl is None else ttl
+        self._set_local(key, value, ttl)
+        shared = self.shared
+        if shared is not None:
+            shared.set(key, value, ttl)
+        return
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Retrieve a value from the cache, calling `loader` on a miss.
+
+        Parameters
+        ----------
+        key: Hashable
+            Cache key.
+
+        loader: Callable
+            Zero-argument function returning the value to cache.
+            Exceptions raised by the loader propagate to the caller and
+            nothing is cached. Concurrent misses for the same key share a
+            single call to the loader.
+
+        ttl: float, optional
+            Time to live of the loaded entry in seconds.
+            Default of `None` uses the cache TTL.
+
+        Returns
+        -------
+        Any
+            Cached or freshly loaded value.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._hits += 1
+                if (
+                    entry.refresh_at <= time.monotonic()
+                    and key not in self._refreshing
+                ):
+                    self._refreshing.add(key)
+                    self._refresh(key, loader, ttl)
+                return entry.value
+            self._misses += 1
+
+        def _load():
+            logger.debug(f"cache miss: {key}")
+            shared = self.shared
+            if shared is None:
+                value = loader()
+                self.set(key, value, ttl)
+                return value
+            # hold the per-key lock across processes so only one of them
+            # calls the loader; the others find its result once they enter
+            with shared.lock(key):
+                found = self._get_shared(key)
+                if found is not None:
+                    return found[0]
+                value = loader()
+                self.set(key, value, ttl)
+            return value
+
+        return self._flight.do(key, _load)
+
+    def derive(
+        self,
+        key: Hashable,
+        value: Any,
+        fun: Callable[[Any], Any],
+        tag: Hashable = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> Any:
+        """Compute a value derived from a cached value, e.g. its parsed
+        form, memoized on the cache entry.
+
+        The derived value is kept only while the entry of `key` holds
+        `value` itself, counts towards `max_bytes` and is dropped with the
+        entry when it is replaced, evicted, expires or is invalidated.
+        When the cache does not hold `value` it is computed every time.
+
+        Parameters
+        ----------
+        key: Hashable
+            Cache key of the entry.
+
+        value: Any
+            Value retrieved from the cache for `key`.
+
+        fun: Callable
+            Function computing the derived value from `value`. Exceptions
+            propagate to the caller and nothing is memoized.
+
+        tag: Hashable, optional
+            Distinguishes the values derived from the same entry.
+            Default of `None` uses `fun`.
+
+        sizeof: Callable, optional
+            Function measuring the size of the derived value in bytes.
+            Default measures the length of `str` and `bytes` values and
+            uses `sys.getsizeof` for anything else.
+
+        Returns
+        -------
+        Any
+            Memoized or freshly derived value.
+        """
+        tag = fun if tag is None else tag
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.value is not value:
+                entry = None
+            elif entry.derived is not None and tag in entry.derived:
+                return entry.derived[tag]
+        derived = fun(value)
+        if entry is None:
+            return derived
+        size = (_sizeof if sizeof is None else sizeof)(derived)
+        with self._lock:
+            if self._entries.get(key) is entry:
+                if entry.derived is None:
+                    entry.derived = {}
+                if tag not in entry.derived:
+                    entry.derived[tag] = derived
+                    entry.size += size
+                    self._bytes += size
+                    self._evict()
+        return derived
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove an entry from the cache, and from the shared cache if any.
+        Return `True` if the entry was present locally."""
+        shared = self.shared
+        if shared is not None:
+            shared.invalidate(key)
+        with self._lock:
+            return self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache and reset the statistics.
+        The shared cache, if any, is left untouched."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = 0
+            self._refreshes = self._evictions = 0
+        return
+
+    def info(self) -> CacheInfo:
+        """Report cache statistics."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._refreshes,
+                self._evictions,
+                len(self._entries),
+                self._bytes,
+            )
+
+    def _set_local(self, key: Hashable, value: Any, ttl: float) -> None:
+        entry = _CacheEntry(
+            value, self._sizeof(value), ttl, self.refresh_ahead
+        )
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+        return
+
+    def _get_shared(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Retrieve a value and its remaining TTL from the shared cache,
+        storing it locally for the time it has left."""
+        shared = self.shared
+        if shared is None:
+            return None
+        found = shared.get_with_ttl(key)
+        if found is None:
+            return None
+        value, remaining = found
+        if self._decode is not None:
+            value = self._decode(value)
+        logger.debug(f"shared cache hit: {key}")
+        self._set_local(key, value, remaining)
+        return value, remaining
+
+    def _lookup(self, key: Hashable) -> Optional[_CacheEntry]:
+        """Find an unexpired entry and mark it most recently used.
+        Caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: Hashable) -> bool:
+        """Caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        return True
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within bounds.
+        Caller must hold the lock."""
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._evictions += 1
+            logger.debug(f"cache evicted: {key}")
+        return
+
+    def _refresh(
+        self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float]
+    ) -> None:
+        """Reload an entry on a background thread."""
+
+        def _run():
+            logger.debug(f"cache refresh-ahead: {key}")
+            try:
+                self._reload(key, loader, ttl)
+                with self._lock:
+                    self._refreshes += 1
+            except Exception as e:
+                logger.warning(f"cache refresh failed: {key}. Reason: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(
+            target=_run, name=f"cache-refresh-{key}", daemon=True
+        ).start()
+        return
+
+    def _reload(
+        self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float]
+    ) -> None:
+        """Call the loader and store its value, unless another process has
+        already refreshed the shared entry."""
+        shared = self.shared
+        if shared is None:
+            self.set(key, loader(), ttl)
+            return
+        ttl = self.ttl if ttl is None else ttl
+        with shared.lock(key):
+            found = shared.get_with_ttl(key)
+            if found is not None and found[1] > ttl * (1 - self.refresh_ahead):
+                value = found[0]
+                if self._decode is not None:
+                    value = self._decode(value)
+                self._set_local(key, value, found[1])
+                return
+            self.set(key, loader(), ttl)
+        return
+
+
+class SharedFileCache:
+    """File-backed cache shared by every process on a host.
+
+    Each entry is a file holding the value as JSON alongside its
+    expiration time, replaced atomically on write. Loads are serialized
+    across processes with a per-key `fcntl` lock file so that concurrent
+    misses result in a single call to AWS. Values are encrypted at rest
+    with Fernet, which requires the optional `cryptography` package. Only
+    JSON-serializable values are shared; others are silently kept
+    process-local. POSIX only.
+
+    The encryption key is kept off disk: pass it as `key`, or generate one
+    with `generate_key()` in a parent process and export it in the
+    `KEY_ENV` environment variable before starting the workers. A key
+    stored beside the entries adds nothing to the directory permissions,
+    so it is only used when `key_on_disk` is set.
+
+    Parameters
+    ----------
+    directory: str, optional
+        Directory holding the entries. It is created if necessary and must
+        be owned by, and only accessible to, the current user.
+        Default of `None` uses a per-user directory beneath the system
+        temporary directory.
+
+    namespace: str, optional
+        Subdirectory separating unrelated caches sharing the directory.
+        Default is `"default"`.
+
+    encrypt: bool, optional
+        When `True` entries are encrypted with Fernet. Disable only where
+        the directory is otherwise protected.
+        Default is `True`.
+
+    key: bytes, optional
+        URL-safe base64-encoded 32-byte Fernet key shared by every process
+        using the cache. Default of `None` reads the key from the `KEY_ENV`
+        environment variable.
+
+    key_on_disk: bool, optional
+        When `True` and no key is given, a key is generated on first use
+        and stored in `directory`. Otherwise a missing key raises
+        `ValueError`.
+        Default is `False`.
+    """
+
+    KEY_ENV = "TOPSHELFSOFTWARE_SHARED_CACHE_KEY"
+    KEY_FILE = ".key"
+    ENTRY_SUFFIX = ".entry"
+    LOCK_SUFFIX = ".lock"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        namespace: str = "default",
+        encrypt: bool = True,
+        key: Optional[bytes] = None,
+        key_on_disk: bool = False,
+    ):
+        if directory is None:
+            directory = os.path.join(
+                tempfile.gettempdir(),
+                f"topshelfsoftware-aws-util-{os.getuid()}",
+            )
+        self.directory = os.path.join(directory, namespace)
+        _make_private_dir(directory)
+        _make_private_dir(self.directory)
+        self._fernet = (
+            _load_fernet(directory, key, key_on_disk) if encrypt else None
+        )
+        logger.debug(f"shared cache at {self.directory}, encrypted: {encrypt}")
+
+    @staticmethod
+    def generate_key() -> bytes:
+        """Generate a key for the `key` argument or `KEY_ENV` variable."""
+        return _import_fernet().generate_key()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retrieve an unexpired value from the shared cache, or
+        `default`."""
+        found = self.get_with_ttl(key)
+        return default if found is None else found[0]
+
+    def get_with_ttl(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Retrieve an unexpired value and its remaining time to live in
+        seconds, or `None` if absent."""
+        path = self._path(key, self.ENTRY_SUFFIX)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            if self._fernet is not None:
+                data = self._fernet.decrypt(data)
+            record = json.loads(data)
+            if record["key"] != repr(key):
+                return None
+            remaining = record["expires_at"] - time.time()
+        except Exception as e:
+            logger.warning(f"discarding unreadable shared entry: {key}. {e}")
+            self._unlink(path)
+            return None
+        if remaining <= 0:
+            self._unlink(path)
+            return None
+        return record["value"], remaining
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value in the shared cache for `ttl` seconds."""
+        record = {"key": repr(key), "expires_at": time.time() + ttl}
+        try:
+            data = json.dumps({**record, "value": value}).encode()
+        except (TypeError, ValueError):
+            logger.debug(f"value not shareable, kept local: {key}")
+            return
+        if self._fernet is not None:
+            data = self._fernet.encrypt(data)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key, self.ENTRY_SUFFIX))
+        except OSError as e:
+            logger.warning(f"failed to write shared entry: {key}. {e}")
+            self._unlink(tmp)
+        return
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove an entry. Return `True` if the entry was present."""
+        return self._unlink(self._path(key, self.ENTRY_SUFFIX))
+
+    def clear(self) -> None:
+        """Remove every entry in the namespace."""
+        for name in os.listdir(self.directory):
+            if name.endswith(self.ENTRY_SUFFIX):
+                self._unlink(os.path.join(self.directory, name))
+        return
+
+    @contextmanager
+    def lock(self, key: Hashable) -> Iterator[None]:
+        """Hold an exclusive lock on a key across processes."""
+        import fcntl  # POSIX only, so imported once a cache is in use
+
+        fd = os.open(
+            self._path(key, self.LOCK_SUFFIX), os.O_RDWR | os.O_CREAT, 0o600
+        )
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _path(self, key: Hashable, suffix: str) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest + suffix)
+
+    @staticmethod
+    def _unlink(path: str) -> bool:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def freeze(obj: Any) -> Any:
+    """Convert decoded JSON into read-only containers so that it can be
+    memoized and shared between callers. Objects become read-only mappings
+    and arrays become tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Copy an exception without its traceback, or return it as is if it
+    cannot be copied."""
+    try:
+        return copy.copy(error)
+    except Exception:
+        return error
+
+
+def _make_private_dir(directory: str) -> None:
+    """Create a directory accessible only to the current user, refusing
+    to use one that is owned by, or open to, anyone else."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) & 0o077:
+        raise PermissionError(
+            f"shared cache directory must be private to the user: {directory}"
+        )
+    return
+
+
+def _import_fernet():
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError as e:
+        logger.error(
+            "encrypting the shared cache requires the cryptography package"
+        )
+        raise e
+    return Fernet
+
+
+def _load_fernet(
+    directory: str, key: Optional[bytes] = None, key_on_disk: bool = False
+):
+    """Build the cipher from the given key or the `KEY_ENV` variable.
+    Otherwise, if allowed, load the key file from the directory, generating
+    it on first use. The key file is published with a hard link so that
+    concurrent processes agree on a single key."""
+    Fernet = _import_fernet()
+    if key is None:
+        key = os.environ.get(SharedFileCache.KEY_ENV)
+    if key is not None:
+        return Fernet(key)
+    if not key_on_disk:
+        logger.error("no shared cache key given")
+        raise ValueError(
+            f"pass a key or set {SharedFileCache.KEY_ENV} to encrypt the "
+            "shared cache, or set key_on_disk to store one beside it"
+        )
+
+    logger.warning(f"storing the shared cache key on disk in {directory}")
+    path = os.path.join(directory, SharedFileCache.KEY_FILE)
+    if not os.path.exists(path):
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(Fernet.generate_key())
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+    with open(path, "rb") as f:
+        return Fernet(f.read())
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return sys.getsizeof(value)
@@ -1,17 +1,49 @@
 """Facilitate interactions with low-level service clients."""
 
+from collections import namedtuple
+import threading
+from typing import Optional
+import weakref
+
 from boto3.session import Session as Boto3Session
 from botocore.client import BaseClient
+from botocore.config import Config
 from botocore.exceptions import InvalidRegionError, UnknownServiceError
 
 from topshelfsoftware_logging import get_logger
 
 logger = get_logger(__name__, stream=None)
 
+ClientCacheInfo = namedtuple(
+    "ClientCacheInfo", ["hits", "misses", "sessions", "clients"]
+)
+
+# process-wide registry of sessions and clients. boto3 sessions are not
+# thread-safe, so all session and client construction happens under the lock.
+# the clients themselves are thread-safe once created.
+_registry_lock = threading.RLock()
+_sessions: dict = {}
+_clients: dict = {}
+_hits = 0
+_misses = 0
+_lazy_clients: "weakref.WeakSet[LazyClient]" = weakref.WeakSet()
+_default_config: Optional[Config] = None
 
-def create_boto3_client(service_name: str, region: str = None) -> BaseClient:
+
+def create_boto3_client(
+    service_name: str,
+    region: str = None,
+    profile: str = None,
+    config: Optional[Config] = None,
+    use_cache: bool = True,
+) -> BaseClient:
     """Create a low-level service client by name.
 
+    Clients are cached process-wide and keyed on the service name, region,
+    profile and client config, so repeated calls with the same arguments
+    reuse the same session and client instead of reloading the service
+    model, endpoint resolver and credential chain.
+
     Parameters
     ----------
     service_name: str
@@ -21,20 +53,266 @@ def create_boto3_client(service_name: str, region: str = None) -> BaseClient:
         Region where service abides.
         Default is `None`.
 
+    profile: str, optional
+        Name of the AWS profile used to create the session.
+        Default of `None` uses the default credential chain.
+
+    config: botocore.config.Config, optional
+        Advanced client configuration options. Options set here take
+        precedence over the package-wide defaults set with
+        `set_default_client_config`.
+        Default is `None`.
+
+    use_cache: bool, optional
+        When `True` the client is retrieved from, or stored to, the
+        process-wide client registry. If `False`, a new session and client
+        are always created.
+        Default is `True`.
+
     Returns
     -------
     botocore.client.BaseClient
         AWS low-level service client.
     """
-    logger.debug(f"creating boto3 client: {service_name}")
-    try:
-        session = Boto3Session(region_name=region)
-        client = session.client(service_name=service_name)
-    except UnknownServiceError as e:
-        logger.error(f"Unknown service specified: {service_name}")
-        raise e
-    except InvalidRegionError as e:
-        logger.error(f"Invalid region specified: {region}")
-        raise e
+    global _hits, _misses
+
+    config = _merge_config(_default_config, config)
+    key = (service_name, region, profile, _config_key(config))
+    with _registry_lock:
+        if use_cache and key in _clients:
+            _hits += 1
+            logger.debug(f"reusing cached boto3 client: {service_name}")
+            return _clients[key]
+
+        logger.debug(f"creating boto3 client: {service_name}")
+        try:
+            session = (
+                _get_session(region, profile)
+                if use_cache
+                else Boto3Session(region_name=region, profile_name=profile)
+            )
+            client = session.client(service_name=service_name, config=config)
+        except UnknownServiceError as e:
+            logger.error(f"Unknown service specified: {service_name}")
+            raise e
+        except InvalidRegionError as e:
+            logger.error(f"Invalid region specified: {region}")
+            raise e
+        if use_cache:
+            _misses += 1
+            _clients[key] = client
     logger.debug("boto3 client successfully created")
     return client
+
+
+def clear_client_cache(service_name: str = None) -> None:
+    """Invalidate cached clients.
+
+    Parameters
+    ----------
+    service_name: str, optional
+        Name of the AWS service whose clients are invalidated.
+        Default of `None` invalidates every cached session and client,
+        and resets the hit/miss counters.
+    """
+    global _hits, _misses
+
+    with _registry_lock:
+        if service_name is None:
+            logger.debug("clearing all cached boto3 sessions and clients")
+            _sessions.clear()
+            _clients.clear()
+            _hits = _misses = 0
+        else:
+            logger.debug(f"clearing cached boto3 clients: {service_name}")
+            for key in [k for k in _clients if k[0] == service_name]:
+                del _clients[key]
+        lazy_clients = [
+            lazy_client
+            for lazy_client in _lazy_clients
+            if service_name in (None, lazy_client._service_name)
+        ]
+    # reset outside the registry lock, as a proxy holds its own lock while
+    # creating its client through the registry
+    for lazy_client in lazy_clients:
+        lazy_client.reset()
+    return
+
+
+def transport_config(
+    max_pool_connections: Optional[int] = None,
+    tcp_keepalive: Optional[bool] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+    retry_mode: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> Config:
+    """Build a client config from connection pool and transport options.
+    Options left as `None` fall back to the botocore defaults.
+
+    Parameters
+    ----------
+    max_pool_connections: int, optional
+        Maximum number of connections kept in the client connection pool.
+        Size this to the number of threads sharing the client.
+        The botocore default is `10`.
+
+    tcp_keepalive: bool, optional
+        Enable the TCP keep-alive socket option on connections.
+        The botocore default is `False`.
+
+    connect_timeout: float, optional
+        Seconds to wait when attempting to make a connection.
+        The botocore default is `60`.
+
+    read_timeout: float, optional
+        Seconds to wait when attempting to read from a connection.
+        The botocore default is `60`.
+
+    retry_mode: str, optional
+        Retry mode, one of `legacy`, `standard` or `adaptive`.
+
+    max_attempts: int, optional
+        Maximum number of attempts, including the initial call.
+
+    Returns
+    -------
+    botocore.config.Config
+        Client configuration.
+    """
+    options = {
+        "max_pool_connections": max_pool_connections,
+        "tcp_keepalive": tcp_keepalive,
+        "connect_timeout": connect_timeout,
+        "read_timeout": read_timeout,
+    }
+    retries = {"mode": retry_mode, "total_max_attempts": max_attempts}
+    retries = {k: v for k, v in retries.items() if v is not None}
+    if retries:
+        options["retries"] = retries
+    return Config(**{k: v for k, v in options.items() if v is not None})
+
+
+def set_default_client_config(config: Optional[Config]) -> None:
+    """Set the package-wide client config.
+
+    Every client subsequently created by the package, including the
+    module-level clients in `secrets`, `ssm` and `sfn`, inherits these
+    options. Set this once at startup, before the first AWS call; cached
+    clients are invalidated so they are rebuilt with the new options.
+
+    Parameters
+    ----------
+    config: botocore.config.Config
+        Default client configuration, e.g. built with `transport_config`.
+        `None` removes the package-wide defaults.
+    """
+    global _default_config
+
+    logger.debug(f"setting default client config: {_config_key(config)}")
+    with _registry_lock:
+        _default_config = config
+        clear_client_cache()
+    return
+
+
+def get_default_client_config() -> Optional[Config]:
+    """Retrieve the package-wide client config."""
+    return _default_config
+
+
+class LazyClient:
+    """Proxy to a low-level service client that is created on first use.
+
+    Attribute access is forwarded to the underlying client, which is built
+    through `create_boto3_client` the first time it is needed. This lets
+    modules expose a client at import time without paying for the session
+    and service model until a call is actually made.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        region: str = None,
+        profile: str = None,
+        config: Optional[Config] = None,
+    ):
+        self._service_name = service_name
+        self._region = region
+        self._profile = profile
+        self._config = config
+        self._client = None
+        self._lock = threading.Lock()
+        _lazy_clients.add(self)
+
+    def __getattr__(self, name: str):
+        return getattr(self.get_client(), name)
+
+    def __repr__(self) -> str:
+        state = "created" if self._client is not None else "deferred"
+        return f"<LazyClient {self._service_name} ({state})>"
+
+    def get_client(self) -> BaseClient:
+        """Retrieve the underlying client, creating it if necessary."""
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = create_boto3_client(
+                        service_name=self._service_name,
+                        region=self._region,
+                        profile=self._profile,
+                        config=self._config,
+                    )
+                client = self._client
+        return client
+
+    def reset(self) -> None:
+        """Discard the underlying client so the next use creates it again."""
+        with self._lock:
+            self._client = None
+        return
+
+
+def get_client_cache_info() -> ClientCacheInfo:
+    """Report statistics for the process-wide client registry.
+
+    Returns
+    -------
+    ClientCacheInfo
+        Named tuple of cache hits, cache misses, number of cached sessions
+        and number of cached clients.
+    """
+    with _registry_lock:
+        return ClientCacheInfo(_hits, _misses, len(_sessions), len(_clients))
+
+
+def _get_session(region: Optional[str], profile: Optional[str]):
+    """Retrieve the cached session for the region and profile, creating it
+    on first use. Caller must hold the registry lock."""
+    key = (region, profile)
+    session = _sessions.get(key)
+    if session is None:
+        logger.debug(f"creating boto3 session: {key}")
+        session = Boto3Session(region_name=region, profile_name=profile)
+        _sessions[key] = session
+    return session
+
+
+def _merge_config(
+    default: Optional[Config], config: Optional[Config]
+) -> Optional[Config]:
+    """Layer the client config on top of the package-wide default."""
+    if default is None or config is None:
+        return config if config is not None else default
+    return default.merge(config)
+
+
+def _config_key(config: Optional[Config]) -> Optional[tuple]:
+    """Build a hashable key from the options set on a client config."""
+    if config is None:
+        return None
+    return tuple(
+        (opt, repr(getattr(config, opt, None)))
+        for opt in sorted(Config.OPTION_DEFAULTS)
+    )
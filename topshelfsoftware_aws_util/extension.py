@@ -0,0 +1,136 @@
+"""Facilitate interactions with the AWS Parameters and Secrets Lambda
+Extension, which serves cached secrets and parameters over localhost."""
+
+from enum import Enum
+import http.client
+import json
+import os
+import threading
+from urllib.parse import urlencode
+
+from topshelfsoftware_logging import get_logger
+
+logger = get_logger(__name__, stream=None)
+
+EXTENSION_HOST = "localhost"
+EXTENSION_PORT_ENV_VAR = "PARAMETERS_SECRETS_EXTENSION_HTTP_PORT"
+EXTENSION_DEFAULT_PORT = 2773
+EXTENSION_TIMEOUT = 1.0
+SESSION_TOKEN_HEADER = "X-Aws-Parameters-Secrets-Token"
+
+# HTTP connections are not thread-safe, so each thread keeps its own
+# persistent connection to the extension
+_local = threading.local()
+
+
+class Backend(str, Enum):
+    """Enumeration for the backends secrets and parameters are read from."""
+
+    BOTO3 = "boto3"
+    EXTENSION = "extension"
+
+
+class ExtensionError(Exception):
+    """Raised when a value cannot be retrieved from the extension."""
+
+
+def get_secret_from_extension(
+    secret_id: str, version_stage: str = None, version_id: str = None
+) -> dict:
+    """Retrieve a managed secret from the extension cache.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret to retrieve.
+
+    version_stage: str, optional
+        Staging label of the version to retrieve.
+        Default is `None`.
+
+    version_id: str, optional
+        Unique identifier of the version to retrieve.
+        Default is `None`.
+
+    Returns
+    -------
+    dict
+        Secrets Manager `GetSecretValue` response.
+    """
+    query = {"secretId": secret_id}
+    if version_stage is not None:
+        query["versionStage"] = version_stage
+    if version_id is not None:
+        query["versionId"] = version_id
+    return _get("/secretsmanager/get", query)
+
+
+def get_parameter_from_extension(
+    name: str, with_decryption: bool = False
+) -> dict:
+    """Retrieve an SSM parameter from the extension cache.
+
+    Parameters
+    ----------
+    name: str
+        Name of the SSM parameter.
+
+    with_decryption: bool, optional
+        When `True` a SecureString parameter value is decrypted.
+        Defaults to `False`.
+
+    Returns
+    -------
+    dict
+        Systems Manager `GetParameter` response.
+    """
+    query = {"name": name, "withDecryption": str(with_decryption).lower()}
+    return _get("/systemsmanager/parameters/get", query)
+
+
+def _get(path: str, query: dict) -> dict:
+    """Issue a GET request to the extension and decode the JSON response."""
+    token = os.environ.get("AWS_SESSION_TOKEN")
+    if not token:
+        raise ExtensionError("AWS_SESSION_TOKEN is not set")
+
+    url = f"{path}?{urlencode(query)}"
+    logger.debug(f"requesting from extension: {path}")
+    conn = _get_connection()
+    try:
+        conn.request("GET", url, headers={SESSION_TOKEN_HEADER: token})
+        resp = conn.getresponse()
+        body = resp.read()
+    except (OSError, http.client.HTTPException) as e:
+        _close_connection()
+        raise ExtensionError(f"extension request failed: {e}") from e
+    if resp.status != 200:
+        raise ExtensionError(
+            f"extension responded with status {resp.status}: {path}"
+        )
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise ExtensionError(f"extension returned invalid json: {e}") from e
+
+
+def _get_connection() -> http.client.HTTPConnection:
+    """Retrieve this thread's connection to the extension, reconnecting if
+    the configured port has changed."""
+    port = int(os.environ.get(EXTENSION_PORT_ENV_VAR, EXTENSION_DEFAULT_PORT))
+    conn = getattr(_local, "conn", None)
+    if conn is None or conn.port != port:
+        _close_connection()
+        conn = http.client.HTTPConnection(
+            EXTENSION_HOST, port, timeout=EXTENSION_TIMEOUT
+        )
+        _local.conn = conn
+    return conn
+
+
+def _close_connection() -> None:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+    return
@@ -1,15 +1,71 @@
 """Facilitate interactions with Secrets Manager."""
 
+from collections import namedtuple
+from enum import Enum
+import json
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
 from botocore.exceptions import ClientError as BotoClientError
 
-from topshelfsoftware_aws_util.client import create_boto3_client
+from topshelfsoftware_aws_util.cache import (
+    SharedFileCache,
+    SingleFlight,
+    TTLCache,
+    freeze,
+)
+from topshelfsoftware_aws_util.client import LazyClient
+from topshelfsoftware_aws_util.extension import (
+    Backend,
+    ExtensionError,
+    get_secret_from_extension,
+)
 from topshelfsoftware_logging import get_logger
 
-secret_client = create_boto3_client(service_name="secretsmanager")
+secret_client = LazyClient(service_name="secretsmanager")
+secret_cache = TTLCache(ttl=300, max_entries=512, max_bytes=4 * 1024 * 1024)
 logger = get_logger(__name__, stream=None)
 
+# maximum number of secret ids accepted by a single BatchGetSecretValue call
+BATCH_GET_SECRET_LIMIT = 20
+
+SecretVersion = namedtuple("SecretVersion", ["version_id", "version_stages"])
+
+# backend single secret lookups are read from, see `set_secret_backend`
+_secret_backend = Backend.BOTO3
+
+# coalesces concurrent lookups of the same secret into a single API call
+_secret_flight = SingleFlight()
+
+# version metadata of the values held in `secret_cache`, by cache key.
+# only written when a value is stored to the cache, so uncached lookups
+# cannot vouch for a cached value retrieved before a rotation
+_secret_versions: Dict[Hashable, SecretVersion] = {}
 
-def get_secret_value(secret_id: str) -> str:
+
+class SecretStage(str, Enum):
+    """Enumeration for the staging labels attached to secret versions."""
+
+    CURRENT = "AWSCURRENT"
+    PENDING = "AWSPENDING"
+    PREVIOUS = "AWSPREVIOUS"
+
+
+def get_secret_value(
+    secret_id: str,
+    use_cache: bool = False,
+    ttl: Optional[float] = None,
+    version_stage: Optional[str] = None,
+    version_id: Optional[str] = None,
+) -> str:
     """Retrieve the value of a managed secret.
 
     Parameters
@@ -17,14 +73,450 @@ def get_secret_value(secret_id: str) -> str:
     secret_id: str
         The ARN or name of the secret to retrieve.
 
+    use_cache: bool, optional
+        When `True` the value is served from `secret_cache` and only
+        retrieved from Secrets Manager on a miss. Entries close to expiry
+        are refreshed in the background.
+        Default is `False`.
+
+    ttl: float, optional
+        Time to live in seconds of a value stored to the cache.
+        Default of `None` uses the TTL of `secret_cache`.
+
+    version_stage: str, optional
+        Staging label of the version to retrieve, e.g. `AWSPENDING`.
+        See `SecretStage`.
+        Default of `None` retrieves the `AWSCURRENT` version.
+
+    version_id: str, optional
+        Unique identifier of the version to retrieve.
+        Default is `None`.
+
     Returns
     -------
     str
         Secret value.
+
+    Notes
+    -----
+    Concurrent lookups of the same secret are coalesced so that only one
+    request is in flight; every caller receives its result or exception.
+    The version of a value stored to the cache is tracked and can be
+    inspected with `get_secret_version`.
+    """
+    version_stage = _stage_value(version_stage)
+    key = _secret_key(secret_id, version_stage, version_id)
+
+    def _fetch():
+        return _secret_flight.do(
+            key,
+            lambda: _fetch_secret_value(secret_id, version_stage, version_id),
+        )
+
+    if not use_cache:
+        return _fetch()[0]
+
+    def _load():
+        val, version = _fetch()
+        _secret_versions[key] = version
+        return val
+
+    return secret_cache.get_or_load(key, _load, ttl=ttl)
+
+
+def get_secret_values(
+    secret_ids: Optional[Iterable[str]] = None,
+    filters: Optional[List[dict]] = None,
+    populate_cache: bool = True,
+    ttl: Optional[float] = None,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Retrieve the values of many managed secrets in batches.
+
+    Secrets are retrieved with `BatchGetSecretValue`, at most
+    `BATCH_GET_SECRET_LIMIT` per call, following `NextToken` until every
+    page is read. Secrets that cannot be retrieved are reported in the
+    errors rather than failing the whole batch.
+
+    Parameters
+    ----------
+    secret_ids: Iterable[str], optional
+        The ARNs or names of the secrets to retrieve.
+        Either `secret_ids` or `filters` must be provided, but not both.
+
+    filters: list[dict], optional
+        Secrets Manager filters selecting the secrets to retrieve,
+        e.g. `[{"Key": "name", "Values": ["prod/"]}]`.
+
+    populate_cache: bool, optional
+        When `True` the retrieved values are stored to `secret_cache` so
+        subsequent cached lookups with `get_secret_value` are free.
+        Default is `True`.
+
+    ttl: float, optional
+        Time to live in seconds of the values stored to the cache.
+        Default of `None` uses the TTL of `secret_cache`.
+
+    Returns
+    -------
+    tuple[dict[str, str], dict[str, str]]
+        Secret values keyed by the requested ARN or name, and error
+        messages keyed by the ARN or name of each secret that failed.
+        Secrets selected with `filters` are keyed by name.
+    """
+    if (secret_ids is None) == (filters is None):
+        raise ValueError("provide exactly one of secret_ids or filters")
+
+    values: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    versions: Dict[str, SecretVersion] = {}
+    if filters is not None:
+        logger.debug(f"getting secrets matching filters: {filters}")
+        try:
+            _batch_get_secrets(values, errors, versions, Filters=filters)
+        except BotoClientError as e:
+            logger.error(
+                f"failed to retrieve secrets matching filters: {filters}. "
+                f"Reason: {e}"
+            )
+            raise e
+    else:
+        secret_ids = list(dict.fromkeys(secret_ids))
+        logger.debug(f"getting {len(secret_ids)} secrets in batches")
+        for i in range(0, len(secret_ids), BATCH_GET_SECRET_LIMIT):
+            chunk = secret_ids[i : i + BATCH_GET_SECRET_LIMIT]
+            try:
+                _batch_get_secrets(
+                    values, errors, versions, SecretIdList=chunk
+                )
+            except BotoClientError as e:
+                logger.error(
+                    f"failed to retrieve secrets: {chunk}. Reason: {e}"
+                )
+                errors.update({secret_id: str(e) for secret_id in chunk})
+
+    if populate_cache:
+        for secret_id, val in values.items():
+            secret_cache.set(secret_id, val, ttl)
+            _secret_versions[secret_id] = versions[secret_id]
+    logger.debug(
+        f"retrieved {len(values)} secrets, {len(errors)} failed: "
+        f"{list(errors)}"
+    )
+    return values, errors
+
+
+def get_secret_json(
+    secret_id: str, use_cache: bool = False, ttl: Optional[float] = None
+) -> Mapping[str, Any]:
+    """Retrieve a managed secret whose value is a JSON object.
+
+    When served from the cache, the parsed object is memoized on the cache
+    entry and dropped with it, so it is only parsed again once the entry
+    is refreshed, evicted, expires or is invalidated.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret to retrieve.
+
+    use_cache: bool, optional
+        When `True` the raw value is served from `secret_cache`.
+        See `get_secret_value`.
+        Default is `False`.
+
+    ttl: float, optional
+        Time to live in seconds of a value stored to the cache.
+        Default of `None` uses the TTL of `secret_cache`.
+
+    Returns
+    -------
+    Mapping[str, Any]
+        Read-only mapping of the secret. Nested objects are read-only
+        mappings and arrays are tuples.
     """
+    val = get_secret_value(secret_id, use_cache=use_cache, ttl=ttl)
+    if not use_cache:
+        return _parse_secret_json(secret_id, val)
+    return secret_cache.derive(
+        _secret_key(secret_id),
+        val,
+        lambda v: _parse_secret_json(secret_id, v),
+        tag="json",
+    )
+
+
+def get_secret_key(
+    secret_id: str,
+    key: str,
+    use_cache: bool = False,
+    ttl: Optional[float] = None,
+) -> Any:
+    """Retrieve a single key from a managed secret whose value is a JSON
+    object. See `get_secret_json`.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret to retrieve.
+
+    key: str
+        Key within the secret JSON object.
+
+    use_cache: bool, optional
+        When `True` the raw value is served from `secret_cache`.
+        Default is `False`.
+
+    ttl: float, optional
+        Time to live in seconds of a value stored to the cache.
+        Default of `None` uses the TTL of `secret_cache`.
+
+    Returns
+    -------
+    Any
+        Value of the key.
+    """
+    try:
+        val = get_secret_json(secret_id, use_cache=use_cache, ttl=ttl)[key]
+    except KeyError as e:
+        logger.error(f"key not found in secret: {secret_id}. Reason: {e}")
+        raise e
+    logger.debug(f"secret key {key}: <redacted>")
+    return val
+
+
+def get_secret_version(
+    secret_id: str, version_stage: Optional[str] = None
+) -> Optional[SecretVersion]:
+    """Retrieve the version metadata of the value held in the cache.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret.
+
+    version_stage: str, optional
+        Staging label the value was retrieved by.
+        Default of `None` refers to the `AWSCURRENT` version.
+
+    Returns
+    -------
+    SecretVersion, optional
+        Named tuple of the version id and staging labels, or `None` if the
+        secret has not been cached.
+    """
+    return _secret_versions.get(
+        _secret_key(secret_id, _stage_value(version_stage))
+    )
+
+
+def is_secret_stale(
+    secret_id: str, version_stage: Optional[str] = None
+) -> bool:
+    """Check whether the secret has rotated since it was last cached.
+
+    Compares the cached version id with the version currently holding the
+    staging label, using `DescribeSecret`, which does not return the secret
+    value.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret.
+
+    version_stage: str, optional
+        Staging label to check.
+        Default of `None` checks the `AWSCURRENT` version.
+
+    Returns
+    -------
+    bool
+        `True` if the staging label now points at a different version, or
+        the secret has not been cached; otherwise, `False`.
+    """
+    tracked = get_secret_version(secret_id, version_stage)
+    if tracked is None:
+        return True
+
+    stage = _stage_value(version_stage) or SecretStage.CURRENT.value
+    logger.debug(f"describing secret: {secret_id}")
+    try:
+        desc_resp = secret_client.describe_secret(SecretId=secret_id)
+    except BotoClientError as e:
+        logger.error(f"failed to describe secret: {secret_id}. Reason: {e}")
+        raise e
+    current_id = next(
+        (
+            vid
+            for vid, stages in desc_resp.get("VersionIdsToStages", {}).items()
+            if stage in stages
+        ),
+        None,
+    )
+    stale = current_id != tracked.version_id
+    logger.debug(
+        f"secret {secret_id} {stage} version: {current_id} "
+        f"(tracked: {tracked.version_id}, stale: {stale})"
+    )
+    return stale
+
+
+def refresh_secret_if_rotated(
+    secret_id: str,
+    version_stage: Optional[str] = None,
+    ttl: Optional[float] = None,
+) -> bool:
+    """Refresh a cached secret only if it has rotated.
+
+    When the tracked version is still current the cached value is kept and
+    its time to live is renewed; otherwise the value is retrieved again and
+    stored to the cache. This allows a long TTL without serving stale
+    credentials after a rotation.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret.
+
+    version_stage: str, optional
+        Staging label of the cached value.
+        Default of `None` refers to the `AWSCURRENT` version.
+
+    ttl: float, optional
+        Time to live in seconds of the cache entry.
+        Default of `None` uses the TTL of `secret_cache`.
+
+    Returns
+    -------
+    bool
+        `True` if the value was retrieved again; otherwise, `False`.
+    """
+    version_stage = _stage_value(version_stage)
+    key = _secret_key(secret_id, version_stage)
+    if not is_secret_stale(secret_id, version_stage):
+        val = secret_cache.get(key)
+        if val is not None:
+            secret_cache.set(key, val, ttl)
+            return False
+
+    logger.debug(f"refreshing rotated secret: {secret_id}")
+    val, version = _fetch_secret_value(secret_id, version_stage)
+    secret_cache.set(key, val, ttl)
+    _secret_versions[key] = version
+    return True
+
+
+def set_secret_backend(backend: str) -> None:
+    """Select the backend single secret lookups are read from.
+
+    Parameters
+    ----------
+    backend: str
+        `boto3` reads from Secrets Manager. `extension` reads from the
+        AWS Parameters and Secrets Lambda Extension over localhost, falling
+        back to Secrets Manager when the extension misses or fails.
+        See `topshelfsoftware_aws_util.extension.Backend`.
+    """
+    global _secret_backend
+
+    _secret_backend = Backend(backend)
+    logger.debug(f"secret backend: {_secret_backend.value}")
+    return
+
+
+def set_secret_shared_cache(shared: Optional[SharedFileCache]) -> None:
+    """Share cached secrets between the processes on a host.
+
+    Cached lookups that miss `secret_cache` consult the shared cache before
+    calling Secrets Manager, and every value stored to `secret_cache` is
+    written through to it, so one process's fetch serves the others.
+
+    Parameters
+    ----------
+    shared: SharedFileCache
+        Cross-process cache, e.g. `SharedFileCache(namespace="secrets")`.
+        `None` stops sharing.
+    """
+    logger.debug(f"secret shared cache: {getattr(shared, 'directory', None)}")
+    secret_cache.shared = shared
+    return
+
+
+def invalidate_secret(secret_id: str) -> None:
+    """Remove a secret from the cache so the next lookup retrieves it.
+
+    Parameters
+    ----------
+    secret_id: str
+        The ARN or name of the secret to invalidate.
+    """
+    logger.debug(f"invalidating cached secret: {secret_id}")
+    # the current version may be shared without being cached locally
+    secret_cache.invalidate(secret_id)
+    for key in secret_cache.keys():
+        if key == secret_id or (
+            isinstance(key, tuple) and key[0] == secret_id
+        ):
+            secret_cache.invalidate(key)
+    for key in list(_secret_versions):
+        if key == secret_id or (
+            isinstance(key, tuple) and key[0] == secret_id
+        ):
+            _secret_versions.pop(key, None)
+    return
+
+
+def clear_secret_cache() -> None:
+    """Remove every secret from the cache."""
+    logger.debug("clearing secret cache")
+    secret_cache.clear()
+    _secret_versions.clear()
+    return
+
+
+def _batch_get_secrets(
+    values: Dict[str, str],
+    errors: Dict[str, str],
+    versions: Dict[str, SecretVersion],
+    **kwargs,
+) -> None:
+    """Page through `BatchGetSecretValue`, collecting the secret values,
+    their versions and per-secret errors. Secrets requested by
+    `SecretIdList` are keyed by the requested ARN or name; otherwise by
+    name."""
+    requested = set(kwargs.get("SecretIdList", ()))
+    while True:
+        resp = secret_client.batch_get_secret_value(**kwargs)
+        for secret in resp.get("SecretValues", []):
+            key = (
+                secret["ARN"] if secret["ARN"] in requested else secret["Name"]
+            )
+            if "SecretString" not in secret:
+                errors[key] = "secret value is not a string"
+                continue
+            values[key] = secret["SecretString"]
+            versions[key] = _secret_version(key, secret)
+        for error in resp.get("Errors", []):
+            logger.error(
+                f"failed to retrieve secret: {error['SecretId']}. "
+                f"Reason: {error['ErrorCode']}"
+            )
+            errors[error["SecretId"]] = (
+                f"{error['ErrorCode']}: {error.get('Message', '')}"
+            )
+        if not resp.get("NextToken"):
+            return
+        kwargs["NextToken"] = resp["NextToken"]
+
+
+def _fetch_secret_value(
+    secret_id: str,
+    version_stage: Optional[str] = None,
+    version_id: Optional[str] = None,
+) -> Tuple[str, SecretVersion]:
+    """Retrieve the value of a managed secret and its version."""
     logger.debug(f"getting secret: {secret_id}")
     try:
-        secret_resp = secret_client.get_secret_value(SecretId=secret_id)
+        secret_resp = _get_secret_resp(secret_id, version_stage, version_id)
         val = secret_resp["SecretString"]
     except BotoClientError as e:
         logger.error(f"failed to retrieve secret: {secret_id}. Reason: {e}")
@@ -35,5 +527,78 @@ def get_secret_value(secret_id: str) -> str:
             f"{secret_id}. Reason: {e}"
         )
         raise e
+    version = _secret_version(
+        _secret_key(secret_id, version_stage, version_id), secret_resp
+    )
     logger.debug("secret string: <redacted>")
-    return val
+    return val, version
+
+
+def _get_secret_resp(
+    secret_id: str, version_stage: Optional[str], version_id: Optional[str]
+) -> dict:
+    """Retrieve the `GetSecretValue` response from the selected backend."""
+    if _secret_backend == Backend.EXTENSION:
+        try:
+            return get_secret_from_extension(
+                secret_id, version_stage, version_id
+            )
+        except ExtensionError as e:
+            logger.warning(
+                f"extension failed to retrieve secret: {secret_id}, "
+                f"falling back to boto3. Reason: {e}"
+            )
+    kwargs = {"SecretId": secret_id}
+    if version_stage is not None:
+        kwargs["VersionStage"] = version_stage
+    if version_id is not None:
+        kwargs["VersionId"] = version_id
+    return secret_client.get_secret_value(**kwargs)
+
+
+def _parse_secret_json(secret_id: str, val: str) -> Mapping[str, Any]:
+    """Parse a secret value into a read-only JSON object."""
+    logger.debug(f"parsing secret json: {secret_id}")
+    try:
+        parsed = json.loads(val)
+    except json.JSONDecodeError as e:
+        # the exception message does not include the secret value
+        logger.error(f"failed to parse secret as json: {secret_id}. {e.msg}")
+        raise e
+    if not isinstance(parsed, dict):
+        logger.error(f"secret is not a json object: {secret_id}")
+        raise TypeError(f"secret is not a json object: {secret_id}")
+    return freeze(parsed)
+
+
+def _secret_key(
+    secret_id: str,
+    version_stage: Optional[str] = None,
+    version_id: Optional[str] = None,
+) -> Hashable:
+    """Build the cache key of a secret version. The current version is
+    keyed by the secret id alone."""
+    if (
+        version_stage in (None, SecretStage.CURRENT.value)
+        and version_id is None
+    ):
+        return secret_id
+    return (secret_id, version_stage, version_id)
+
+
+def _stage_value(version_stage: Optional[str]) -> Optional[str]:
+    """Normalize a staging label, which may be a `SecretStage`, to the plain
+    string sent to Secrets Manager and the extension."""
+    if isinstance(version_stage, Enum):
+        return version_stage.value
+    return version_stage
+
+
+def _secret_version(key: Hashable, secret_resp: dict) -> SecretVersion:
+    """Extract the version of a retrieved secret value."""
+    version = SecretVersion(
+        secret_resp.get("VersionId"),
+        tuple(secret_resp.get("VersionStages", ())),
+    )
+    logger.debug(f"secret {key} version: {version.version_id}")
+    return version
@@ -1,19 +1,108 @@
 """Facilitate interactions with Step Functions."""
 
+import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import datetime, timezone
 from enum import Enum
+import hashlib
+import heapq
+import io
 import json
-from typing import Callable, Optional, Tuple
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 import uuid
+import weakref
 
-from topshelfsoftware_aws_util.client import create_boto3_client
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError as BotoClientError
+
+from topshelfsoftware_aws_util.client import LazyClient
 from topshelfsoftware_logging import get_logger
+from topshelfsoftware_polling.exceptions import (
+    PollAttemptLimitReached,
+    PollTimeLimitReached,
+)
 from topshelfsoftware_polling.polling import poll
-from topshelfsoftware_polling.step import step_exponential_backoff
+from topshelfsoftware_polling.step import (
+    step_constant,
+    step_exponential_backoff,
+)
 from topshelfsoftware_util.json import fmt_json
 
-sfn_client = create_boto3_client("stepfunctions")
+sfn_client = LazyClient("stepfunctions")
+# StartSyncExecution holds the connection for up to the five minute express
+# limit and is not idempotent, so it is never retried by the client
+sfn_sync_client = LazyClient(
+    "stepfunctions",
+    config=Config(read_timeout=310, retries={"max_attempts": 0}),
+)
+sqs_client = LazyClient("sqs")
+s3_client = LazyClient("s3")
 logger = get_logger(__name__, stream=None)
 
+# EventBridge detail type of Step Functions execution status changes
+STATUS_CHANGE_DETAIL_TYPE = "Step Functions Execution Status Change"
+
+# maximum size in bytes of the input of an execution
+MAX_INPUT_BYTES = 256 * 1024
+
+# size in bytes above which claim-check payloads are uploaded in parts
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+# key of the reference passed in place of an offloaded payload
+CLAIM_CHECK_KEY = "claimCheck"
+
+# maximum length of a Step Functions execution name
+EXECUTION_NAME_MAX_LENGTH = 80
+
+# hex characters of the payload digest kept in a derived execution name,
+# enough that distinct payloads do not collide
+EXECUTION_NAME_MIN_DIGEST = 32
+
+# maximum number of API calls in flight at once from the coroutines, per
+# event loop, unless a limiter is passed explicitly
+ASYNC_CONCURRENCY_LIMIT = 16
+
+# error codes of calls that are retried with backoff
+_THROTTLING_ERRORS = ("ThrottlingException", "TooManyRequestsException")
+
+# execution history event types that conclude an execution
+_CONCLUDING_EVENTS = {
+    "ExecutionSucceeded": "SUCCEEDED",
+    "ExecutionFailed": "FAILED",
+    "ExecutionTimedOut": "TIMED_OUT",
+    "ExecutionAborted": "ABORTED",
+}
+
+# state machine types by ARN, learned from StartSyncExecution, so that
+# Standard state machines are launched and polled without another attempt
+_state_machine_types: Dict[str, str] = {}
+
+# default concurrency limiter of each running event loop
+_async_limiters: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
 
 class SfnStatus(str, Enum):
     """Enumeration for step function status."""
@@ -24,20 +113,29 @@ class SfnStatus(str, Enum):
     FAILED = "FAILED"
     TIMED_OUT = "TIMED_OUT"
     ABORTED = "ABORTED"
+    PENDING_REDRIVE = "PENDING_REDRIVE"  # failed and awaiting a redrive
 
     @property
     def is_concluded(self):
         """Indicates the Step Function is done, but not necessarily succeeded.
-        True if status is NOT in WAITING or RUNNING state;
+        True if status is NOT in WAITING, RUNNING or PENDING_REDRIVE state;
         otherwise, False."""
         values = [
             SfnStatus.WAITING.value,
             SfnStatus.RUNNING.value,
+            SfnStatus.PENDING_REDRIVE.value,
         ]
         return self.value not in values
 
 
-def launch_sfn(state_machine_arn: str, payload: dict, name: str = None) -> str:
+def launch_sfn(
+    state_machine_arn: str,
+    payload: dict,
+    name: str = None,
+    claim_check_bucket: Optional[str] = None,
+    claim_check_prefix: str = "sfn-payloads/",
+    claim_check_threshold: int = MAX_INPUT_BYTES,
+) -> str:
     """Launch the step function with the specified payload.
 
     Parameters
@@ -52,6 +150,22 @@ def launch_sfn(state_machine_arn: str, payload: dict, name: str = None) -> str:
         The execution name of the state machine.
         Default of `None` generates a random UUID for the name.
 
+    claim_check_bucket: str, optional
+        S3 bucket oversized payloads are offloaded to. When the serialized
+        payload exceeds `claim_check_threshold` bytes it is uploaded, and
+        the execution input is a claim-check reference to the object, see
+        `resolve_claim_check`.
+        Default of `None` always passes the payload as input.
+
+    claim_check_prefix: str, optional
+        Prefix of the keys of offloaded payloads, which are named after
+        the execution.
+        Default is `"sfn-payloads/"`.
+
+    claim_check_threshold: int, optional
+        Size in bytes above which payloads are offloaded.
+        Default is `MAX_INPUT_BYTES`, the Step Functions input limit.
+
     Returns
     -------
     str
@@ -60,12 +174,22 @@ def launch_sfn(state_machine_arn: str, payload: dict, name: str = None) -> str:
     name = str(uuid.uuid4()) if name is None else name
     logger.info(f"Execution name: {name}")
 
+    # serialize the payload once, offloading it if too large to pass
+    sfn_input = json.dumps(payload)
+    if claim_check_bucket is not None:
+        data = sfn_input.encode()
+        if len(data) > claim_check_threshold:
+            ref = put_claim_check(
+                data, claim_check_bucket, f"{claim_check_prefix}{name}.json"
+            )
+            sfn_input = json.dumps(ref)
+
     # run step function
     logger.info(f"Launching step function: {state_machine_arn}")
     res = sfn_client.start_execution(
         stateMachineArn=state_machine_arn,
         name=name,
-        input=json.dumps(payload),
+        input=sfn_input,
     )
 
     # retrieve the execution arn for the step function
@@ -74,6 +198,324 @@ def launch_sfn(state_machine_arn: str, payload: dict, name: str = None) -> str:
     return execution_arn
 
 
+def put_claim_check(data: bytes, bucket: str, key: str) -> dict:
+    """Upload serialized JSON to S3 and build a claim-check reference.
+    Objects larger than `MULTIPART_THRESHOLD` bytes are uploaded in parts.
+
+    Parameters
+    ----------
+    data: bytes
+        Serialized JSON.
+
+    bucket: str
+        Name of the S3 bucket.
+
+    key: str
+        Key of the object.
+
+    Returns
+    -------
+    dict
+        Claim-check reference, `{"claimCheck": {"bucket": ..., "key": ...}}`.
+    """
+    logger.info(f"offloading {len(data)} bytes to s3://{bucket}/{key}")
+    try:
+        if len(data) > MULTIPART_THRESHOLD:
+            s3_client.upload_fileobj(
+                io.BytesIO(data),
+                bucket,
+                key,
+                ExtraArgs={"ContentType": "application/json"},
+                Config=TransferConfig(multipart_threshold=MULTIPART_THRESHOLD),
+            )
+        else:
+            s3_client.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=data,
+                ContentType="application/json",
+            )
+    except BotoClientError as e:
+        logger.error(f"failed to offload to s3://{bucket}/{key}. Reason: {e}")
+        raise e
+    return {CLAIM_CHECK_KEY: {"bucket": bucket, "key": key}}
+
+
+def resolve_claim_check(data: Any) -> Any:
+    """Retrieve the JSON a claim-check reference refers to.
+
+    Parameters
+    ----------
+    data: Any
+        Decoded JSON, e.g. the output of an execution. Anything other than
+        a claim-check reference is returned as is.
+
+    Returns
+    -------
+    Any
+        Decoded JSON the reference refers to, or `data`.
+    """
+    if not (isinstance(data, dict) and set(data) == {CLAIM_CHECK_KEY}):
+        return data
+    bucket = data[CLAIM_CHECK_KEY]["bucket"]
+    key = data[CLAIM_CHECK_KEY]["key"]
+    logger.debug(f"resolving claim check: s3://{bucket}/{key}")
+    try:
+        res = s3_client.get_object(Bucket=bucket, Key=key)
+    except BotoClientError as e:
+        logger.error(f"failed to resolve s3://{bucket}/{key}. Reason: {e}")
+        raise e
+    with res["Body"] as body:
+        return json.load(body)
+
+
+def launch_sfn_batch(
+    state_machine_arn: str,
+    payloads: Iterable[dict],
+    rate: float = 25,
+    burst: Optional[int] = None,
+    max_workers: int = 8,
+    max_retries: int = 8,
+    name_fun: Optional[Callable[[dict], str]] = None,
+) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """Launch an execution of the step function for each payload.
+
+    Executions are started on a bounded thread pool at no more than `rate`
+    calls per second. Throttled calls are retried with exponential backoff
+    and full jitter. Execution names are derived from the payloads, so
+    launching the same batch again does not start duplicate executions.
+    Payloads are consumed lazily and results are yielded as they complete,
+    so arbitrarily large batches run in constant memory.
+
+    Parameters
+    ----------
+    state_machine_arn: str
+        The ARN of the state machine.
+
+    payloads: Iterable[dict]
+        Payloads input to supply to the state machine, one per execution.
+
+    rate: float, optional
+        Maximum number of `StartExecution` calls per second.
+        Default is `25`.
+
+    burst: int, optional
+        Maximum number of calls made back to back after a quiet period.
+        Default of `None` uses `max_workers`.
+
+    max_workers: int, optional
+        Maximum number of `StartExecution` calls in flight at once.
+        Default is `8`.
+
+    max_retries: int, optional
+        Maximum number of retries of a throttled call.
+        Default is `8`.
+
+    name_fun: Callable, optional
+        Function returning the execution name of a payload.
+        Default is `topshelfsoftware_aws_util.sfn.execution_name`.
+
+    Yields
+    ------
+    tuple[str, str | Exception]
+        Execution name, and the execution ARN or the exception raised
+        while naming or starting it. An execution that already exists under
+        the name is reported by its ARN. The name is `None` if `name_fun`
+        failed.
+    """
+    name_fun = execution_name if name_fun is None else name_fun
+    bucket = TokenBucket(rate, max_workers if burst is None else burst)
+    logger.info(f"Launching batch of step functions: {state_machine_arn}")
+
+    def _launch(payload: dict) -> Tuple[str, Union[str, Exception]]:
+        # any failure is reported for its own payload, not the whole batch
+        name = None
+        try:
+            name = name_fun(payload)
+            return name, _start_execution(
+                state_machine_arn, name, payload, bucket, max_retries
+            )
+        except Exception as e:
+            logger.error(f"failed to launch execution: {name}. Reason: {e}")
+            return name, e
+
+    # keep a bounded window of calls in flight so that the payloads are
+    # consumed no faster than they are launched
+    payloads = iter(payloads)
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            for payload in payloads:
+                in_flight.add(executor.submit(_launch, payload))
+                if len(in_flight) >= 2 * max_workers:
+                    break
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    return
+
+
+def execution_name(payload: dict, prefix: str = "") -> str:
+    """Derive a deterministic execution name from a payload.
+
+    Parameters
+    ----------
+    payload: dict
+        Payload input to supply to the state machine.
+
+    prefix: str, optional
+        Prefix of the name, e.g. identifying the batch, of at most
+        `EXECUTION_NAME_MAX_LENGTH - EXECUTION_NAME_MIN_DIGEST` characters
+        so that enough of the payload digest is kept.
+        Default is `""`.
+
+    Returns
+    -------
+    str
+        Execution name of at most `EXECUTION_NAME_MAX_LENGTH` characters.
+    """
+    max_prefix = EXECUTION_NAME_MAX_LENGTH - EXECUTION_NAME_MIN_DIGEST
+    if len(prefix) > max_prefix:
+        raise ValueError(
+            f"execution name prefix longer than {max_prefix} characters"
+        )
+    digest = hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+    return (prefix + digest)[:EXECUTION_NAME_MAX_LENGTH]
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of calls.
+
+    Parameters
+    ----------
+    rate: float
+        Number of tokens added per second.
+
+    capacity: int, optional
+        Maximum number of tokens held, i.e. the largest burst of calls.
+        Default is `1`.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token, blocking until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+def run_sfn_sync(
+    state_machine_arn: str,
+    payload: dict,
+    name: str = None,
+    poll_kwargs: Optional[dict] = None,
+) -> dict:
+    """Run the step function to completion with the specified payload.
+
+    Express state machines are run with `StartSyncExecution`, returning
+    in a single round trip once the execution concludes. Standard state
+    machines, which do not support it, fall back to `launch_sfn` followed
+    by `poll_sfn`; the type is remembered so later runs go straight to the
+    fallback. Either way the response has the shape returned by
+    `poll_sfn`, see `get_sfn_output` to decode its output.
+
+    Parameters
+    ----------
+    state_machine_arn: str
+        The ARN of the state machine.
+
+    payload: dict
+        Payload input to supply to the state machine.
+
+    name: str, Optional
+        The execution name of the state machine.
+        Default of `None` generates a random UUID for the name.
+
+    poll_kwargs: dict, optional
+        Keyword arguments passed to `poll_sfn` when falling back.
+        Default is `None`.
+
+    Returns
+    -------
+    dict
+        Step Functions execution response.
+    """
+    if _state_machine_types.get(state_machine_arn) != "STANDARD":
+        name = str(uuid.uuid4()) if name is None else name
+        logger.info(f"Running express step function: {state_machine_arn}")
+        try:
+            res = sfn_sync_client.start_sync_execution(
+                stateMachineArn=state_machine_arn,
+                name=name,
+                input=json.dumps(payload),
+            )
+        except BotoClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code != "StateMachineTypeNotSupported":
+                logger.error(
+                    f"failed to run step function: {state_machine_arn}. "
+                    f"Reason: {e}"
+                )
+                raise e
+            logger.debug(f"not an express state machine: {state_machine_arn}")
+            _state_machine_types[state_machine_arn] = "STANDARD"
+        else:
+            _state_machine_types[state_machine_arn] = "EXPRESS"
+            logger.info(f"sfn response: {fmt_json(res)}")
+            return res
+
+    execution_arn = launch_sfn(state_machine_arn, payload, name)
+    return poll_sfn(execution_arn, **(poll_kwargs or {}))
+
+
+def get_sfn_output(res: dict, resolve: bool = False) -> Any:
+    """Decode the JSON output of a step function execution response.
+
+    Parameters
+    ----------
+    res: dict
+        Step Functions execution response, e.g. returned by `poll_sfn` or
+        `run_sfn_sync`.
+
+    resolve: bool, optional
+        When `True` an output that is a claim-check reference is resolved
+        from S3, see `resolve_claim_check`.
+        Default is `False`.
+
+    Returns
+    -------
+    Any
+        Decoded output, or `None` if the execution produced no output.
+    """
+    output = res.get("output")
+    if output is None:
+        return None
+    output = json.loads(output)
+    return resolve_claim_check(output) if resolve else output
+
+
 def status_sfn(execution_arn: str) -> dict:
     """Status the step function execution.
 
@@ -89,7 +531,8 @@ def status_sfn(execution_arn: str) -> dict:
     """
     logger.debug(f"statusing execution arn: {execution_arn}")
     res = sfn_client.describe_execution(executionArn=execution_arn)
-    logger.debug(f"sfn execution response: {fmt_json(res)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"sfn execution response: {fmt_json(res)}")
     return res
 
 
@@ -160,6 +603,821 @@ def poll_sfn(
     return res
 
 
+class DurationTracker:
+    """Rolling record of observed execution durations per state machine.
+
+    Parameters
+    ----------
+    window: int, optional
+        Number of most recent durations kept per state machine.
+        Default is `100`.
+
+    path: str, optional
+        JSON file the durations are loaded from and saved to after every
+        record, so they survive restarts.
+        Default of `None` keeps them in memory only.
+    """
+
+    def __init__(self, window: int = 100, path: Optional[str] = None):
+        self.window = window
+        self.path = path
+        self._durations: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for arn, durations in json.load(f).items():
+                    self._durations[arn] = deque(durations, maxlen=window)
+
+    def record(self, state_machine_arn: str, duration: float) -> None:
+        """Record the duration in seconds of a concluded execution."""
+        with self._lock:
+            durations = self._durations.setdefault(
+                state_machine_arn, deque(maxlen=self.window)
+            )
+            durations.append(duration)
+            if self.path is not None:
+                self._save()
+        return
+
+    def percentile(
+        self, state_machine_arn: str, q: float = 0.5
+    ) -> Optional[float]:
+        """Estimate the `q` quantile, between `0` and `1`, of the recorded
+        durations in seconds, or `None` if none are recorded."""
+        with self._lock:
+            durations = sorted(self._durations.get(state_machine_arn, ()))
+        if not durations:
+            return None
+        rank = min(len(durations) - 1, max(0, int(q * len(durations))))
+        return durations[rank]
+
+    def _save(self) -> None:
+        """Write the durations atomically. Caller must hold the lock."""
+        data = {arn: list(d) for arn, d in self._durations.items()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+        return
+
+
+# durations observed by `poll_sfn_adaptive` unless a tracker is passed
+sfn_durations = DurationTracker()
+
+
+def poll_sfn_adaptive(
+    execution_arn: str,
+    tracker: Optional[DurationTracker] = None,
+    percentile: float = 0.5,
+    lead: float = 0.8,
+    dense_interval: float = 0.5,
+    max_dense_polls: int = 10,
+    timeout: float = 300,
+    ignore_exceptions: Optional[Tuple[Exception, ...]] = None,
+) -> dict:
+    """Poll the step function for status, on a schedule learned from the
+    durations of previous executions of the same state machine.
+    Return the execution response once the Step Function has concluded.
+
+    The execution is statused once, then left alone until `lead` of the
+    expected duration has elapsed since it started, then statused every
+    `dense_interval` seconds. An execution still running after
+    `max_dense_polls` statuses is overrunning, so polling then backs off
+    exponentially from `dense_interval` until it concludes. Until
+    durations have been recorded for the state machine, it is polled like
+    `poll_sfn`. The duration of every execution that succeeds is recorded.
+
+    Parameters
+    ----------
+    execution_arn: str
+        Step Functions execution ARN.
+
+    tracker: DurationTracker, optional
+        Durations of previous executions.
+        Default of `None` uses `sfn_durations`.
+
+    percentile: float, optional
+        Quantile of the recorded durations taken as the expected duration.
+        Default is `0.5`.
+
+    lead: float, optional
+        Fraction of the expected duration to wait before polling densely.
+        Default is `0.8`.
+
+    dense_interval: float, optional
+        Seconds between statuses once near the expected completion.
+        Default is `0.5`.
+
+    max_dense_polls: int, optional
+        Number of statuses made every `dense_interval` seconds before
+        backing off.
+        Default is `10`.
+
+    timeout: float, optional
+        Length of poll in seconds.
+        `topshelfsoftware_polling.exceptions.PollTimeLimitReached` raised
+        if this timeout is exceeded.
+        Default is `300`.
+
+    ignore_exceptions: tuple[Exception, ...], optional
+        These exceptions are caught and ignored while polling.
+        Default is `None`.
+
+    Returns
+    -------
+    dict
+        Step Functions execution response.
+    """
+    tracker = sfn_durations if tracker is None else tracker
+    start = time.monotonic()
+    res = status_sfn(execution_arn)
+    state_machine_arn = res["stateMachineArn"]
+    if not SfnStatus(res["status"]).is_concluded:
+        expected = tracker.percentile(state_machine_arn, percentile)
+        if expected is None:
+            logger.debug(f"no durations recorded: {state_machine_arn}")
+            res = poll_sfn(
+                execution_arn,
+                timeout=max(0, timeout - (time.monotonic() - start)),
+                ignore_exceptions=ignore_exceptions,
+            )
+        else:
+            res = _poll_sfn_near(
+                res,
+                expected * lead,
+                dense_interval,
+                max_dense_polls,
+                start + timeout,
+                ignore_exceptions,
+            )
+    if res["status"] == SfnStatus.SUCCEEDED.value and "stopDate" in res:
+        tracker.record(
+            state_machine_arn,
+            (res["stopDate"] - res["startDate"]).total_seconds(),
+        )
+    return res
+
+
+def _poll_sfn_near(
+    res: dict,
+    near_s: float,
+    dense_interval: float,
+    max_dense_polls: int,
+    deadline: float,
+    ignore_exceptions: Optional[Tuple[Exception, ...]],
+) -> dict:
+    """Sleep until `near_s` seconds into the execution, poll densely for
+    at most `max_dense_polls` statuses, then back off until it concludes
+    or the monotonic `deadline` passes."""
+    execution_arn = res["executionArn"]
+    wait_s = min(near_s - _elapsed(res), deadline - time.monotonic())
+    if wait_s > 0:
+        logger.debug(f"expecting completion soon, sleeping {wait_s:.2f}s")
+        time.sleep(wait_s)
+    try:
+        return poll_sfn(
+            execution_arn,
+            step_fun=step_constant,
+            step_fun_kwargs={"step": dense_interval},
+            timeout=max(0, deadline - time.monotonic()),
+            max_attempts=max_dense_polls,
+            ignore_exceptions=ignore_exceptions,
+        )
+    except PollAttemptLimitReached:
+        logger.debug(f"running past the expected duration: {execution_arn}")
+    return poll_sfn(
+        execution_arn,
+        step_fun=step_exponential_backoff,
+        step_fun_kwargs={"base_interval": dense_interval},
+        timeout=max(0, deadline - time.monotonic()),
+        ignore_exceptions=ignore_exceptions,
+    )
+
+
+def watch_sfns(
+    execution_arns: Iterable[str],
+    base_interval: float = 1,
+    max_interval: float = 60,
+    rate: float = 10,
+    timeout: Optional[float] = None,
+    ignore_exceptions: Optional[Tuple[Exception, ...]] = None,
+) -> Iterator[dict]:
+    """Poll many step function executions from a single thread.
+
+    Executions are kept in a priority queue ordered by when each is next
+    due to be statused. Each execution backs off exponentially, with
+    jitter, from `base_interval` up to `max_interval` while it runs, and
+    `describe_execution` calls across all executions share a global budget
+    of `rate` calls per second. Throttled calls are rescheduled.
+
+    Parameters
+    ----------
+    execution_arns: Iterable[str]
+        Step Functions execution ARNs.
+
+    base_interval: float, optional
+        Seconds before an execution is first statused again.
+        Default is `1`.
+
+    max_interval: float, optional
+        Maximum seconds between statuses of an execution.
+        Default is `60`.
+
+    rate: float, optional
+        Maximum number of `DescribeExecution` calls per second.
+        Default is `10`.
+
+    timeout: float, optional
+        Length of the watch in seconds.
+        `topshelfsoftware_polling.exceptions.PollTimeLimitReached` raised
+        if executions are still running after this timeout.
+        Default of `None` means watch with no time limit.
+
+    ignore_exceptions: tuple[Exception, ...], optional
+        These exceptions are caught and ignored, and the execution is
+        statused again later.
+        Default is `None`.
+
+    Yields
+    ------
+    dict
+        Step Functions execution response of each execution, as soon as it
+        has concluded.
+    """
+    ignore_exceptions = ignore_exceptions or ()
+    bucket = TokenBucket(rate)
+    start = time.monotonic()
+    # (due time, sequence number, execution arn, attempt); the sequence
+    # number breaks ties so that arns are never compared
+    queue = [(start, seq, arn, 0) for seq, arn in enumerate(execution_arns)]
+    heapq.heapify(queue)
+    seq = len(queue)
+    logger.info(f"watching {len(queue)} sfn executions")
+    while queue:
+        due, _, arn, attempt = heapq.heappop(queue)
+        now = time.monotonic()
+        if timeout is not None and due - start > timeout:
+            pending = [arn] + [item[2] for item in queue]
+            logger.error(f"sfn executions still running: {pending}")
+            raise PollTimeLimitReached(
+                f"{len(pending)} executions still running after {timeout}s"
+            )
+        if due > now:
+            time.sleep(due - now)
+
+        bucket.acquire()
+        try:
+            res = status_sfn(arn)
+            if SfnStatus(res["status"]).is_concluded:
+                logger.info(f"sfn execution concluded: {arn}")
+                yield res
+                continue
+        except BotoClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code not in _THROTTLING_ERRORS and not isinstance(
+                e, ignore_exceptions
+            ):
+                raise e
+            logger.debug(f"statusing {arn} failed, retrying. Reason: {e}")
+        except ignore_exceptions as e:
+            logger.debug(f"statusing {arn} failed, retrying. Reason: {e}")
+
+        interval = min(max_interval, base_interval * 2**attempt)
+        interval *= random.uniform(0.5, 1)
+        heapq.heappush(
+            queue, (time.monotonic() + interval, seq, arn, attempt + 1)
+        )
+        seq += 1
+    return
+
+
+async def alaunch_sfn(
+    state_machine_arn: str,
+    payload: dict,
+    name: str = None,
+    limiter: Optional[asyncio.Semaphore] = None,
+) -> str:
+    """Launch the step function with the specified payload.
+    Coroutine version of `launch_sfn`.
+
+    Parameters
+    ----------
+    state_machine_arn: str
+        The ARN of the state machine.
+
+    payload: dict
+        Payload input to supply to the state machine.
+
+    name: str, Optional
+        The execution name of the state machine.
+        Default of `None` generates a random UUID for the name.
+
+    limiter: asyncio.Semaphore, optional
+        Bounds the number of API calls in flight at once.
+        Default of `None` uses a limiter shared by the coroutines on the
+        running event loop, of size `ASYNC_CONCURRENCY_LIMIT`.
+
+    Returns
+    -------
+    str
+        Step Functions execution ARN.
+    """
+    return await _run_limited(
+        limiter, launch_sfn, state_machine_arn, payload, name
+    )
+
+
+async def astatus_sfn(
+    execution_arn: str, limiter: Optional[asyncio.Semaphore] = None
+) -> dict:
+    """Status the step function execution.
+    Coroutine version of `status_sfn`.
+
+    Parameters
+    ----------
+    execution_arn: str
+        Step Functions execution ARN.
+
+    limiter: asyncio.Semaphore, optional
+        Bounds the number of API calls in flight at once.
+        Default of `None` uses a limiter shared by the coroutines on the
+        running event loop, of size `ASYNC_CONCURRENCY_LIMIT`.
+
+    Returns
+    -------
+    dict
+        Step Functions execution response.
+    """
+    return await _run_limited(limiter, status_sfn, execution_arn)
+
+
+async def apoll_sfn(
+    execution_arn: str,
+    base_interval: float = 1,
+    max_interval: float = 60,
+    timeout: float = 300,
+    max_attempts: Optional[int] = None,
+    ignore_exceptions: Optional[Tuple[Exception, ...]] = None,
+    limiter: Optional[asyncio.Semaphore] = None,
+) -> dict:
+    """Poll the step function for status.
+    Return the execution response once the Step Function has concluded.
+    Coroutine version of `poll_sfn`.
+
+    Waits between statuses are non-blocking and back off exponentially,
+    with jitter, from `base_interval` up to `max_interval`. No thread is
+    held while waiting, so many executions can be awaited concurrently.
+
+    Parameters
+    ----------
+    execution_arn: str
+        Step Functions execution ARN.
+
+    base_interval: float, optional
+        Seconds before the execution is first statused again.
+        Default is `1`.
+
+    max_interval: float, optional
+        Maximum seconds between statuses.
+        Default is `60`.
+
+    timeout: float, optional
+        Length of poll in seconds.
+        `topshelfsoftware_polling.exceptions.PollTimeLimitReached` raised
+        if this timeout is exceeded.
+        Default is `300`.
+
+    max_attempts: int, optional
+        Maximum number of times the execution is statused before failing.
+        `topshelfsoftware_polling.exceptions.PollAttemptLimitReached` raised
+        if attempts exceeds this value.
+        Default of `None` means poll with no limit for number of attempts.
+
+    ignore_exceptions: tuple[Exception, ...], optional
+        These exceptions are caught and ignored, and the execution is
+        statused again later.
+        Default is `None`.
+
+    limiter: asyncio.Semaphore, optional
+        Bounds the number of API calls in flight at once.
+        Default of `None` uses a limiter shared by the coroutines on the
+        running event loop, of size `ASYNC_CONCURRENCY_LIMIT`.
+
+    Returns
+    -------
+    dict
+        Step Functions execution response.
+    """
+    ignore_exceptions = ignore_exceptions or ()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt = 0
+    while True:
+        try:
+            res = await astatus_sfn(execution_arn, limiter)
+            if SfnStatus(res["status"]).is_concluded:
+                logger.info(f"sfn response: {fmt_json(res)}")
+                return res
+        except ignore_exceptions as e:
+            logger.debug(f"statusing failed, retrying. Reason: {e}")
+        attempt += 1
+        if max_attempts is not None and attempt >= max_attempts:
+            raise PollAttemptLimitReached(
+                f"execution still running after {attempt} attempts: "
+                f"{execution_arn}"
+            )
+        interval = min(max_interval, base_interval * 2 ** (attempt - 1))
+        interval *= random.uniform(0.5, 1)
+        if loop.time() + interval > deadline:
+            raise PollTimeLimitReached(
+                f"execution still running after {timeout}s: {execution_arn}"
+            )
+        await asyncio.sleep(interval)
+
+
+class SfnEventWaiter:
+    """Wait for executions to conclude using status-change events rather
+    than polling.
+
+    Step Functions execution status-change events are routed by an
+    EventBridge rule to an SQS queue, which is read with long polling.
+    Each concluded event resolves the waiter registered for its execution
+    ARN, and the messages read are deleted in batches. Executions that
+    have waited longer than `fallback_after` without an event, e.g. if the
+    event was lost, are statused with `status_sfn` instead. Events that
+    conclude an execution before it is registered are remembered, up to
+    `max_concluded` of the most recent, and resolve it on registration.
+    The queue should be dedicated to the waiter, as every message read is
+    deleted whether or not an execution is waiting on it.
+
+    Parameters
+    ----------
+    queue_url: str
+        URL of the SQS queue receiving the status-change events.
+
+    wait_time: int, optional
+        Seconds to long poll the queue for, at most `20`.
+        Default is `20`.
+
+    fallback_after: float, optional
+        Seconds to wait for an event before statusing the execution.
+        Default is `300`.
+
+    max_concluded: int, optional
+        Number of concluded events kept for executions not yet registered.
+        Default is `1000`.
+    """
+
+    def __init__(
+        self,
+        queue_url: str,
+        wait_time: int = 20,
+        fallback_after: float = 300,
+        max_concluded: int = 1000,
+    ):
+        self.queue_url = queue_url
+        self.wait_time = wait_time
+        self.fallback_after = fallback_after
+        self.max_concluded = max_concluded
+        # execution arn -> (future, time registered)
+        self._waiters: Dict[str, Tuple[Future, float]] = {}
+        # execution arn -> detail of a concluded, unregistered execution
+        self._concluded: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SfnEventWaiter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+        return
+
+    def register(self, execution_arn: str) -> Future:
+        """Start waiting for an execution to conclude.
+
+        Parameters
+        ----------
+        execution_arn: str
+            Step Functions execution ARN.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolved with the status-change event detail, or the
+            `status_sfn` response on fallback, once the execution has
+            concluded. Either has the shape of a `status_sfn` response.
+        """
+        with self._lock:
+            concluded = self._concluded.pop(execution_arn, None)
+            if concluded is not None:
+                future = Future()
+                future.set_result(concluded)
+                return future
+            waiter = self._waiters.get(execution_arn)
+            if waiter is None:
+                waiter = self._waiters[execution_arn] = (
+                    Future(),
+                    time.monotonic(),
+                )
+        return waiter[0]
+
+    def wait(self, execution_arn: str, timeout: float = None) -> dict:
+        """Block until an execution has concluded and return its result.
+        The waiter must be started, or `poll_once` called elsewhere."""
+        return self.register(execution_arn).result(timeout)
+
+    def start(self) -> None:
+        """Read the queue on a background thread until stopped."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sfn-event-waiter", daemon=True
+        )
+        self._thread.start()
+        return
+
+    def stop(self) -> None:
+        """Stop the background thread once its current read returns."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return
+
+    def poll_once(self) -> int:
+        """Read one batch of events from the queue, resolve the waiters
+        they conclude and status executions that missed their event.
+        Return the number of waiters resolved."""
+        res = sqs_client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=self.wait_time,
+        )
+        messages = res.get("Messages", [])
+        resolved = 0
+        try:
+            for message in messages:
+                try:
+                    detail = _status_change_detail(message["Body"])
+                    if detail is not None and self._resolve(detail, True):
+                        resolved += 1
+                except Exception as e:
+                    logger.warning(
+                        "failed to process sfn event: "
+                        f"{message.get('MessageId')}. Reason: {e}"
+                    )
+        finally:
+            if messages:
+                self._delete(messages)
+        return resolved + self._fallback()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.warning(f"failed to read sfn events. Reason: {e}")
+                self._stop.wait(1)
+        return
+
+    def _resolve(self, res: dict, remember: bool = False) -> bool:
+        """Resolve the waiter of a concluded execution, if any. Otherwise
+        remember the execution when `remember` is set."""
+        if not _is_concluded(res.get("status")):
+            return False
+        execution_arn = res["executionArn"]
+        with self._lock:
+            waiter = self._waiters.pop(execution_arn, None)
+            if waiter is None:
+                if remember:
+                    self._concluded[execution_arn] = res
+                    self._concluded.move_to_end(execution_arn)
+                    while len(self._concluded) > self.max_concluded:
+                        self._concluded.popitem(last=False)
+                return False
+        logger.info(f"sfn execution concluded: {res['executionArn']}")
+        waiter[0].set_result(res)
+        return True
+
+    def _delete(self, messages: List[dict]) -> None:
+        entries = [
+            {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"]}
+            for i, message in enumerate(messages)
+        ]
+        res = sqs_client.delete_message_batch(
+            QueueUrl=self.queue_url, Entries=entries
+        )
+        for failed in res.get("Failed", []):
+            logger.warning(f"failed to delete sfn event: {failed}")
+        return
+
+    def _fallback(self) -> int:
+        """Status the executions that have waited too long for an event."""
+        cutoff = time.monotonic() - self.fallback_after
+        with self._lock:
+            overdue = [
+                arn for arn, (_, t) in self._waiters.items() if t <= cutoff
+            ]
+        resolved = 0
+        for arn in overdue:
+            logger.debug(f"no event received, statusing: {arn}")
+            try:
+                res = status_sfn(arn)
+            except BotoClientError as e:
+                logger.warning(f"failed to status {arn}. Reason: {e}")
+                continue
+            if self._resolve(res):
+                resolved += 1
+            else:
+                with self._lock:
+                    if arn in self._waiters:
+                        self._waiters[arn] = (
+                            self._waiters[arn][0],
+                            time.monotonic(),
+                        )
+        return resolved
+
+
+def iter_executions(
+    state_machine_arn: str,
+    status_filter: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """Stream the executions of a state machine, most recent first.
+
+    Pages are retrieved lazily by following `nextToken`, so any number of
+    executions are processed in constant memory.
+
+    Parameters
+    ----------
+    state_machine_arn: str
+        The ARN of the state machine.
+
+    status_filter: str, optional
+        Only executions with this status are listed.
+        See `topshelfsoftware_aws_util.sfn.SfnStatus`.
+        Default of `None` lists every execution.
+
+    page_size: int, optional
+        Number of executions retrieved per call, at most `1000`.
+        Default of `None` uses the service default.
+
+    Yields
+    ------
+    dict
+        Step Functions execution summary.
+    """
+    logger.debug(f"listing executions: {state_machine_arn}")
+    paginator = sfn_client.get_paginator("list_executions")
+    kwargs = {"stateMachineArn": state_machine_arn}
+    if status_filter is not None:
+        kwargs["statusFilter"] = SfnStatus(status_filter).value
+    if page_size is not None:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
+    for page in paginator.paginate(**kwargs):
+        yield from page["executions"]
+
+
+class ExecutionStats:
+    """Single-pass, bounded-memory summary of executions.
+
+    Executions are counted by status, their durations are sampled into a
+    fixed-size reservoir from which percentiles are estimated, and
+    concluded executions are bucketed into fixed windows by start time to
+    track the failure rate over time.
+
+    Parameters
+    ----------
+    window: float, optional
+        Length in seconds of the failure-rate windows.
+        Default is `3600`.
+
+    max_windows: int, optional
+        Maximum number of windows kept; the earliest are dropped first.
+        Default is `168`, a week of hourly windows.
+
+    sample_size: int, optional
+        Number of durations kept in the reservoir.
+        Default is `1000`.
+    """
+
+    FAILED_STATUSES = (
+        SfnStatus.FAILED,
+        SfnStatus.TIMED_OUT,
+        SfnStatus.ABORTED,
+    )
+
+    def __init__(
+        self,
+        window: float = 3600,
+        max_windows: int = 168,
+        sample_size: int = 1000,
+    ):
+        self.window = window
+        self.max_windows = max_windows
+        self.sample_size = sample_size
+        self.counts: Dict[SfnStatus, int] = {status: 0 for status in SfnStatus}
+        self.total = 0
+        self._durations: List[float] = []
+        self._n_durations = 0
+        # window start, as a posix timestamp -> [concluded, failed]
+        self._windows: Dict[float, List[int]] = {}
+        self._random = random.Random()
+
+    def add(self, execution: dict) -> None:
+        """Account for an execution summary or response."""
+        status = SfnStatus(execution["status"])
+        self.counts[status] += 1
+        self.total += 1
+        if not status.is_concluded or "stopDate" not in execution:
+            return
+        start_date = execution["startDate"]
+        self._sample((execution["stopDate"] - start_date).total_seconds())
+        start = start_date.timestamp()
+        bucket = self._windows.setdefault(start - start % self.window, [0, 0])
+        bucket[0] += 1
+        if status in self.FAILED_STATUSES:
+            bucket[1] += 1
+        if len(self._windows) > self.max_windows:
+            del self._windows[min(self._windows)]
+        return
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate the `q` quantile, between `0` and `1`, of the
+        durations in seconds, or `None` if none have concluded."""
+        durations = sorted(self._durations)
+        if not durations:
+            return None
+        return durations[min(len(durations) - 1, int(q * len(durations)))]
+
+    def failure_rates(self) -> List[Tuple[datetime, int, int, float]]:
+        """Report, per window in chronological order, the window start and
+        the number of executions concluded, failed and the failure rate."""
+        return [
+            (
+                datetime.fromtimestamp(start, timezone.utc),
+                concluded,
+                failed,
+                failed / concluded,
+            )
+            for start, (concluded, failed) in sorted(self._windows.items())
+        ]
+
+    def _sample(self, duration: float) -> None:
+        """Keep a uniform sample of the durations (reservoir sampling)."""
+        self._n_durations += 1
+        if len(self._durations) < self.sample_size:
+            self._durations.append(duration)
+            return
+        i = self._random.randrange(self._n_durations)
+        if i < self.sample_size:
+            self._durations[i] = duration
+        return
+
+
+def summarize_executions(
+    state_machine_arn: str,
+    status_filter: Optional[str] = None,
+    window: float = 3600,
+    sample_size: int = 1000,
+) -> ExecutionStats:
+    """Summarize the executions of a state machine in a single pass.
+
+    Parameters
+    ----------
+    state_machine_arn: str
+        The ARN of the state machine.
+
+    status_filter: str, optional
+        Only executions with this status are summarized.
+        Default of `None` summarizes every execution.
+
+    window: float, optional
+        Length in seconds of the failure-rate windows.
+        Default is `3600`.
+
+    sample_size: int, optional
+        Number of durations sampled to estimate percentiles.
+        Default is `1000`.
+
+    Returns
+    -------
+    ExecutionStats
+        Counts by status, duration percentiles and failure-rate windows.
+    """
+    stats = ExecutionStats(window=window, sample_size=sample_size)
+    for execution in iter_executions(state_machine_arn, status_filter):
+        stats.add(execution)
+    counts = {k.value: v for k, v in stats.counts.items() if v}
+    logger.info(f"summarized {stats.total} executions: {counts}")
+    return stats
+
+
 def get_exec_hist(execution_arn: str, max_results: int = 5) -> dict:
     """Retrieve the step function execution history.
 
@@ -180,5 +1438,258 @@ def get_exec_hist(execution_arn: str, max_results: int = 5) -> dict:
     exec_history = sfn_client.get_execution_history(
         executionArn=execution_arn, maxResults=max_results, reverseOrder=True
     )
-    logger.info(f"execution history: {fmt_json(exec_history)}")
+    logger.info(
+        f"retrieved {len(exec_history['events'])} execution history events"
+    )
+    # formatting the whole history is costly, so only done when logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"execution history: {fmt_json(exec_history)}")
     return exec_history
+
+
+def iter_exec_hist(
+    execution_arn: str,
+    reverse_order: bool = False,
+    event_types: Optional[Iterable[str]] = None,
+    include_execution_data: bool = True,
+    page_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """Stream the step function execution history, page by page.
+
+    Pages are retrieved lazily by following `nextToken`, so histories of
+    any length are processed in constant memory.
+
+    Parameters
+    ----------
+    execution_arn: str
+        Step Functions execution ARN.
+
+    reverse_order: bool, optional
+        When `True` the most recent events are yielded first.
+        Default is `False`.
+
+    event_types: Iterable[str], optional
+        Only events of these types are yielded, e.g. `TaskFailed`. The
+        filter is applied client-side, so every page is still retrieved.
+        Default of `None` yields every event.
+
+    include_execution_data: bool, optional
+        When `False` the input and output of each event is omitted,
+        shrinking the pages retrieved.
+        Default is `True`.
+
+    page_size: int, optional
+        Number of events retrieved per call, at most `1000`.
+        Default of `None` uses the service default.
+
+    Yields
+    ------
+    dict
+        Step Functions execution history event.
+    """
+    logger.debug(f"streaming execution history: {execution_arn}")
+    event_types = None if event_types is None else set(event_types)
+    paginator = sfn_client.get_paginator("get_execution_history")
+    kwargs = {
+        "executionArn": execution_arn,
+        "reverseOrder": reverse_order,
+        "includeExecutionData": include_execution_data,
+    }
+    if page_size is not None:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
+    for page in paginator.paginate(**kwargs):
+        for event in page["events"]:
+            if event_types is None or event["type"] in event_types:
+                yield event
+
+
+def tail_exec_hist(
+    execution_arn: str,
+    after_event_id: int = 0,
+    base_interval: float = 1,
+    max_interval: float = 30,
+    include_execution_data: bool = True,
+    timeout: Optional[float] = None,
+) -> Iterator[dict]:
+    """Follow the step function execution history as it grows.
+
+    Each tick retrieves only the events newer than the last one seen,
+    reading the history newest first and stopping at the first event
+    already seen. The interval between ticks resets to `base_interval`
+    whenever new events arrive and doubles, up to `max_interval`, while
+    none do. The generator returns once the execution has concluded,
+    which is checked with `status_sfn` whenever a tick finds no new events
+    so that a tail resumed after the concluding event also returns.
+
+    Parameters
+    ----------
+    execution_arn: str
+        Step Functions execution ARN.
+
+    after_event_id: int, optional
+        Only events with a greater id are yielded, e.g. to resume a tail.
+        Default is `0`.
+
+    base_interval: float, optional
+        Seconds between ticks while events are arriving.
+        Default is `1`.
+
+    max_interval: float, optional
+        Maximum seconds between ticks.
+        Default is `30`.
+
+    include_execution_data: bool, optional
+        When `False` the input and output of each event is omitted.
+        Default is `True`.
+
+    timeout: float, optional
+        Length of the tail in seconds.
+        `topshelfsoftware_polling.exceptions.PollTimeLimitReached` raised
+        if the execution is still running after this timeout.
+        Default of `None` means tail with no time limit.
+
+    Yields
+    ------
+    dict
+        Step Functions execution history event, oldest first.
+    """
+    logger.debug(f"tailing execution history: {execution_arn}")
+    deadline = None if timeout is None else time.monotonic() + timeout
+    last_id = after_event_id
+    interval = base_interval
+    while True:
+        events = _get_events_after(
+            execution_arn, last_id, include_execution_data
+        )
+        for event in events:
+            last_id = event["id"]
+            yield event
+            status = SfnStatus(
+                _CONCLUDING_EVENTS.get(event["type"], SfnStatus.RUNNING)
+            )
+            if status.is_concluded:
+                logger.info(f"sfn execution concluded: {status.value}")
+                return
+        if not events and _is_concluded(status_sfn(execution_arn)["status"]):
+            # yield any events written between reading and statusing
+            yield from _get_events_after(
+                execution_arn, last_id, include_execution_data
+            )
+            logger.info(f"sfn execution concluded: {execution_arn}")
+            return
+        interval = base_interval if events else min(max_interval, interval * 2)
+        if deadline is not None and time.monotonic() + interval > deadline:
+            raise PollTimeLimitReached(
+                f"execution still running after {timeout}s: {execution_arn}"
+            )
+        time.sleep(interval)
+
+
+def _get_events_after(
+    execution_arn: str, last_id: int, include_execution_data: bool
+) -> List[dict]:
+    """Retrieve the history events newer than `last_id`, oldest first."""
+    events = []
+    for event in iter_exec_hist(
+        execution_arn,
+        reverse_order=True,
+        include_execution_data=include_execution_data,
+    ):
+        if event["id"] <= last_id:
+            break
+        events.append(event)
+    events.reverse()
+    return events
+
+
+def _is_concluded(status: Optional[str]) -> bool:
+    """Whether a status is concluded, treating any status not in
+    `SfnStatus` as not concluded."""
+    try:
+        return SfnStatus(status).is_concluded
+    except ValueError:
+        logger.debug(f"unknown sfn status: {status}")
+        return False
+
+
+def _status_change_detail(body: str) -> Optional[dict]:
+    """Extract the detail of a Step Functions status-change event from an
+    SQS message body, or `None` if the body is not one. The detail is
+    given the shape of a `describe_execution` response: dates in epoch
+    milliseconds become datetimes and null fields are omitted."""
+    try:
+        event = json.loads(body)
+    except ValueError:
+        logger.warning(f"ignoring message that is not json: {body[:100]}")
+        return None
+    if not isinstance(event, dict) or (
+        event.get("detail-type") != STATUS_CHANGE_DETAIL_TYPE
+    ):
+        logger.debug(f"ignoring event: {body[:100]}")
+        return None
+    detail = {k: v for k, v in event["detail"].items() if v is not None}
+    for k in ("startDate", "stopDate"):
+        if isinstance(detail.get(k), (int, float)):
+            detail[k] = datetime.fromtimestamp(detail[k] / 1000, timezone.utc)
+    return detail
+
+
+def _elapsed(res: dict) -> float:
+    """Seconds since the execution in the response started."""
+    return (datetime.now(timezone.utc) - res["startDate"]).total_seconds()
+
+
+def _start_execution(
+    state_machine_arn: str,
+    name: str,
+    payload: dict,
+    bucket: TokenBucket,
+    max_retries: int,
+) -> str:
+    """Start an execution within the rate limit, retrying throttled calls.
+    Return the execution ARN."""
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
+        try:
+            res = sfn_client.start_execution(
+                stateMachineArn=state_machine_arn,
+                name=name,
+                input=json.dumps(payload),
+            )
+        except BotoClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "ExecutionAlreadyExists":
+                logger.debug(f"execution already exists: {name}")
+                return _execution_arn(state_machine_arn, name)
+            if code not in _THROTTLING_ERRORS or attempt == max_retries:
+                raise e
+            delay = random.uniform(0, min(20.0, 0.1 * 2**attempt))
+            logger.debug(
+                f"throttled launching {name}, retrying in {delay:.2f}s"
+            )
+            time.sleep(delay)
+            continue
+        logger.debug(f"launched execution: {res['executionArn']}")
+        return res["executionArn"]
+
+
+def _execution_arn(state_machine_arn: str, name: str) -> str:
+    """Build the ARN of a standard workflow execution from its name."""
+    return (
+        f"{state_machine_arn.replace(':stateMachine:', ':execution:')}:{name}"
+    )
+
+
+async def _run_limited(
+    limiter: Optional[asyncio.Semaphore], fun: Callable, *args
+):
+    """Run a blocking API call on a worker thread, within the limiter, so
+    the event loop is free while the call is in flight."""
+    if limiter is None:
+        loop = asyncio.get_running_loop()
+        limiter = _async_limiters.get(loop)
+        if limiter is None:
+            limiter = asyncio.Semaphore(ASYNC_CONCURRENCY_LIMIT)
+            _async_limiters[loop] = limiter
+    async with limiter:
+        return await asyncio.to_thread(fun, *args)
@@ -1,15 +1,66 @@
 """Facilitate interactions with Systems Manager."""
 
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
 from botocore.exceptions import ClientError as BotoClientError
 
-from topshelfsoftware_aws_util.client import create_boto3_client
+from topshelfsoftware_aws_util.cache import (
+    SharedFileCache,
+    SingleFlight,
+    TTLCache,
+    freeze,
+)
+from topshelfsoftware_aws_util.client import LazyClient
+from topshelfsoftware_aws_util.extension import (
+    Backend,
+    ExtensionError,
+    get_parameter_from_extension,
+)
 from topshelfsoftware_logging import get_logger
 
-ssm_client = create_boto3_client(service_name="ssm")
+SsmParameter = namedtuple("SsmParameter", ["value", "type"])
+
+ssm_client = LazyClient(service_name="ssm")
+ssm_cache = TTLCache(
+    ttl=300,
+    max_entries=1024,
+    sizeof=lambda param: len(param.value),
+    decode=lambda param: SsmParameter(*param),
+)
+# parameters that were not found are remembered for a shorter time
+ssm_negative_cache = TTLCache(ttl=30, max_entries=1024, refresh_ahead=1)
 logger = get_logger(__name__, stream=None)
 
+# maximum number of names accepted by a single GetParameters call
+GET_PARAMETERS_LIMIT = 10
+
+# backend parameter lookups are read from, see `set_ssm_backend`
+_ssm_backend = Backend.BOTO3
+
+# coalesces concurrent lookups of the same parameter into a single API call
+_ssm_flight = SingleFlight()
+
 
-def get_ssm_value(name: str, with_decryption: bool = False) -> str:
+def get_ssm_value(
+    name: str,
+    with_decryption: bool = False,
+    use_cache: bool = False,
+    ttl: Optional[float] = None,
+) -> str:
     """Retrieve the value of an SSM parameter.
 
     Parameters
@@ -25,16 +76,538 @@ def get_ssm_value(name: str, with_decryption: bool = False) -> str:
         plaintext value.
         Defaults to `False`.
 
+    use_cache: bool, optional
+        When `True` the value is served from `ssm_cache` and only retrieved
+        from Parameter Store on a miss. Parameters that are not found are
+        remembered in `ssm_negative_cache` and raise again without a call
+        until that shorter TTL elapses.
+        Default is `False`.
+
+    ttl: float, optional
+        Time to live in seconds of a value stored to the cache.
+        Default of `None` uses the TTL of `ssm_cache`.
+
     Returns
     -------
     str
         Parameter store value.
+
+    Notes
+    -----
+    Concurrent lookups of the same parameter are coalesced so that only one
+    request is in flight; every caller receives its result or exception.
     """
-    logger.debug(f"getting ssm: {name}")
+    return _get_ssm_param(name, with_decryption, use_cache, ttl).value
+
+
+def get_ssm_typed(
+    name: str,
+    with_decryption: bool = False,
+    as_json: bool = False,
+    use_cache: bool = False,
+    ttl: Optional[float] = None,
+) -> Any:
+    """Retrieve the value of an SSM parameter decoded to a Python value.
+
+    `StringList` parameters are split into a tuple of strings; with
+    `as_json` the value is decoded from JSON into read-only containers.
+    When served from the cache, decoded values are memoized on the cache
+    entry and dropped with it, so they are only decoded again once the
+    entry is refreshed, evicted, expires or is invalidated.
+
+    Parameters
+    ----------
+    name: str
+        Name of the SSM parameter.
+
+    with_decryption: bool, optional
+        When `True` the parameter value will be decrypted if it is a
+        SecureString. See `get_ssm_value`.
+        Defaults to `False`.
+
+    as_json: bool, optional
+        When `True` the value is decoded from JSON. Objects become
+        read-only mappings and arrays become tuples.
+        Default is `False`.
+
+    use_cache: bool, optional
+        When `True` the raw value is served from `ssm_cache`.
+        See `get_ssm_value`.
+        Default is `False`.
+
+    ttl: float, optional
+        Time to live in seconds of a value stored to the cache.
+        Default of `None` uses the TTL of `ssm_cache`.
+
+    Returns
+    -------
+    Any
+        Decoded parameter store value.
+    """
+    param = _get_ssm_param(name, with_decryption, use_cache, ttl)
+    if not use_cache:
+        return _decode_ssm_param(name, param, as_json)
+    return ssm_cache.derive(
+        (name, with_decryption),
+        param,
+        lambda p: _decode_ssm_param(name, p, as_json),
+        tag=("decoded", as_json),
+    )
+
+
+def invalidate_ssm(name: str) -> None:
+    """Remove a parameter from the caches so the next lookup retrieves it.
+
+    Parameters
+    ----------
+    name: str
+        Name of the SSM parameter to invalidate.
+    """
+    logger.debug(f"invalidating cached ssm parameter: {name}")
+    # the parameter may be shared without being cached locally
+    for with_decryption in (False, True):
+        ssm_cache.invalidate((name, with_decryption))
+    for cache in (ssm_cache, ssm_negative_cache):
+        for key in cache.keys():
+            if key[0] == name:
+                cache.invalidate(key)
+    return
+
+
+def set_ssm_shared_cache(shared: Optional[SharedFileCache]) -> None:
+    """Share cached parameters between the processes on a host.
+
+    Cached lookups that miss `ssm_cache` consult the shared cache before
+    calling Parameter Store, and every value stored to `ssm_cache` is
+    written through to it, so one process's fetch serves the others.
+    Parameters that were not found are still remembered per process.
+
+    Parameters
+    ----------
+    shared: SharedFileCache
+        Cross-process cache, e.g. `SharedFileCache(namespace="ssm")`.
+        `None` stops sharing.
+    """
+    logger.debug(f"ssm shared cache: {getattr(shared, 'directory', None)}")
+    ssm_cache.shared = shared
+    return
+
+
+def clear_ssm_cache() -> None:
+    """Remove every parameter from the caches."""
+    logger.debug("clearing ssm cache")
+    ssm_cache.clear()
+    ssm_negative_cache.clear()
+    return
+
+
+def get_ssm_values(
+    names: Iterable[str],
+    with_decryption: bool = False,
+    max_workers: int = 4,
+    populate_cache: bool = True,
+    ttl: Optional[float] = None,
+) -> Tuple[Dict[str, str], List[str]]:
+    """Retrieve the values of many SSM parameters in batches.
+
+    Parameters are retrieved with `GetParameters`, at most
+    `GET_PARAMETERS_LIMIT` per call, with the calls made concurrently.
+
+    Parameters
+    ----------
+    names: Iterable[str]
+        Names of the SSM parameters.
+
+    with_decryption: bool, optional
+        When `True` SecureString parameter values will be decrypted.
+        See `get_ssm_value`.
+        Defaults to `False`.
+
+    max_workers: int, optional
+        Maximum number of `GetParameters` calls in flight at once.
+        Default is `4`.
+
+    populate_cache: bool, optional
+        When `True` the retrieved values are stored to `ssm_cache` so
+        subsequent cached lookups with `get_ssm_value` are free.
+        Default is `True`.
+
+    ttl: float, optional
+        Time to live in seconds of the values stored to the cache.
+        Default of `None` uses the TTL of `ssm_cache`.
+
+    Returns
+    -------
+    tuple[dict[str, str], list[str]]
+        Parameter store values keyed by name, and the names of any
+        parameters that were not found or are otherwise invalid.
+    """
+    names = list(dict.fromkeys(names))
+    chunks = [
+        names[i : i + GET_PARAMETERS_LIMIT]
+        for i in range(0, len(names), GET_PARAMETERS_LIMIT)
+    ]
+    logger.debug(f"getting {len(names)} ssm parameters in {len(chunks)} calls")
+
+    values: Dict[str, str] = {}
+    invalid: List[str] = []
+    if not chunks:
+        return values, invalid
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(chunks)))
+    ) as executor:
+        results = executor.map(
+            lambda chunk: _get_parameters(chunk, with_decryption), chunks
+        )
+        for chunk_params, chunk_invalid in results:
+            for name, param in chunk_params.items():
+                values[name] = param.value
+                if populate_cache:
+                    _cache_ssm_param(name, param, with_decryption, ttl)
+            invalid.extend(chunk_invalid)
+    if invalid:
+        logger.warning(f"invalid ssm parameters: {invalid}")
+    return values, invalid
+
+
+def iter_ssm_path(
+    path: str,
+    recursive: bool = True,
+    with_decryption: bool = False,
+    page_size: Optional[int] = None,
+    populate_cache: bool = False,
+    ttl: Optional[float] = None,
+) -> Iterator[Tuple[str, str]]:
+    """Stream the SSM parameters beneath a path, one page at a time.
+
+    Only the current page is held in memory, so arbitrarily large
+    hierarchies can be processed.
+
+    Parameters
+    ----------
+    path: str
+        Hierarchy of the parameters, e.g. `/app/env/service`.
+
+    recursive: bool, optional
+        When `True` parameters in every level beneath the path are
+        retrieved; otherwise only those directly beneath it.
+        Default is `True`.
+
+    with_decryption: bool, optional
+        When `True` SecureString parameter values will be decrypted.
+        See `get_ssm_value`.
+        Defaults to `False`.
+
+    page_size: int, optional
+        Number of parameters retrieved per call, at most `10`.
+        Default of `None` uses the service default.
+
+    populate_cache: bool, optional
+        When `True` the retrieved values are stored to `ssm_cache` so
+        subsequent cached lookups with `get_ssm_value` are free.
+        Default is `False`.
+
+    ttl: float, optional
+        Time to live in seconds of the values stored to the cache.
+        Default of `None` uses the TTL of `ssm_cache`.
+
+    Yields
+    ------
+    tuple[str, str]
+        Parameter name and value.
+    """
+    logger.debug(f"getting ssm path: {path}")
+    paginator = ssm_client.get_paginator("get_parameters_by_path")
+    kwargs = {
+        "Path": path,
+        "Recursive": recursive,
+        "WithDecryption": with_decryption,
+    }
+    if page_size is not None:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
     try:
-        ssm_resp = ssm_client.get_parameter(
-            Name=name, WithDecryption=with_decryption
+        for page in paginator.paginate(**kwargs):
+            for param in page.get("Parameters", []):
+                _log_ssm_value(param["Name"], param["Value"], param["Type"])
+                if populate_cache:
+                    _cache_ssm_param(
+                        param["Name"],
+                        SsmParameter(param["Value"], param["Type"]),
+                        with_decryption,
+                        ttl,
+                    )
+                yield param["Name"], param["Value"]
+    except BotoClientError as e:
+        logger.error(f"failed to retrieve ssm path: {path}. Reason: {e}")
+        raise e
+
+
+def load_ssm_tree(
+    path: str,
+    recursive: bool = True,
+    with_decryption: bool = False,
+    page_size: Optional[int] = None,
+) -> dict:
+    """Load the SSM parameters beneath a path into a nested dictionary.
+
+    Each level of the hierarchy beneath the path becomes a nested
+    dictionary, e.g. `/app/env/db/host` loaded from `/app/env` is found at
+    `tree["db"]["host"]`. A parameter whose name is also the prefix of
+    other parameters is stored under the `""` key of that level.
+
+    Parameters
+    ----------
+    path: str
+        Hierarchy of the parameters, e.g. `/app/env/service`.
+
+    recursive: bool, optional
+        When `True` parameters in every level beneath the path are loaded.
+        Default is `True`.
+
+    with_decryption: bool, optional
+        When `True` SecureString parameter values will be decrypted.
+        Defaults to `False`.
+
+    page_size: int, optional
+        Number of parameters retrieved per call, at most `10`.
+        Default of `None` uses the service default.
+
+    Returns
+    -------
+    dict
+        Nested dictionary of parameter values.
+    """
+    tree: dict = {}
+    root = path.rstrip("/")
+    params = iter_ssm_path(path, recursive, with_decryption, page_size)
+    for name, val in params:
+        *parents, leaf = name[len(root) :].strip("/").split("/")
+        node = tree
+        for part in parents:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {} if child is None else {"": child}
+            node = child
+        if isinstance(node.get(leaf), dict):
+            node[leaf][""] = val
+        else:
+            node[leaf] = val
+    return tree
+
+
+class SsmSnapshot:
+    """Incrementally refreshed snapshot of the SSM parameters beneath a path.
+
+    Each refresh lists parameter metadata with `DescribeParameters` and only
+    retrieves the values of parameters that are new or whose `Version` or
+    `LastModifiedDate` changed; deleted parameters are dropped. The new
+    values are swapped in as a new read-only mapping, so readers never take
+    a lock and always see a consistent snapshot.
+
+    Parameters
+    ----------
+    path: str
+        Hierarchy of the parameters, e.g. `/app/env/service`.
+
+    recursive: bool, optional
+        When `True` parameters in every level beneath the path are included.
+        Default is `True`.
+
+    with_decryption: bool, optional
+        When `True` SecureString parameter values will be decrypted.
+        Defaults to `False`.
+
+    max_workers: int, optional
+        Maximum number of `GetParameters` calls in flight during a refresh.
+        Default is `4`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        recursive: bool = True,
+        with_decryption: bool = False,
+        max_workers: int = 4,
+    ):
+        self.path = path
+        self.recursive = recursive
+        self.with_decryption = with_decryption
+        self.max_workers = max_workers
+        self._values: Mapping[str, str] = MappingProxyType({})
+        self._versions: Dict[str, tuple] = {}
+        self._refresh_lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> str:
+        return self._values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def values(self) -> Mapping[str, str]:
+        """Read-only mapping of parameter names to values."""
+        return self._values
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Retrieve a parameter value from the current snapshot."""
+        return self._values.get(name, default)
+
+    def refresh(self) -> Tuple[List[str], List[str]]:
+        """Bring the snapshot up to date with Parameter Store.
+
+        Returns
+        -------
+        tuple[list[str], list[str]]
+            Names of the parameters that were added or changed, and names
+            of the parameters that were removed.
+        """
+        with self._refresh_lock:
+            metadata = self._describe()
+            changed = [
+                name
+                for name, version in metadata.items()
+                if self._versions.get(name) != version
+            ]
+            removed = [name for name in self._versions if name not in metadata]
+            if not changed and not removed:
+                logger.debug(f"ssm snapshot unchanged: {self.path}")
+                return changed, removed
+
+            values, invalid = get_ssm_values(
+                changed,
+                self.with_decryption,
+                self.max_workers,
+                populate_cache=False,
+            )
+            snapshot = dict(self._values)
+            versions = dict(self._versions)
+            for name in removed + invalid:
+                snapshot.pop(name, None)
+                versions.pop(name, None)
+            snapshot.update(values)
+            versions.update({name: metadata[name] for name in values})
+
+            # swap in the new snapshot with a single assignment
+            self._values = MappingProxyType(snapshot)
+            self._versions = versions
+        logger.debug(
+            f"ssm snapshot refreshed: {self.path}. "
+            f"changed: {changed}, removed: {removed}"
         )
+        return changed, removed
+
+    def _describe(self) -> Dict[str, tuple]:
+        """List the version metadata of the parameters beneath the path."""
+        paginator = ssm_client.get_paginator("describe_parameters")
+        path_filter = {
+            "Key": "Path",
+            "Option": "Recursive" if self.recursive else "OneLevel",
+            "Values": [self.path],
+        }
+        metadata = {}
+        try:
+            for page in paginator.paginate(ParameterFilters=[path_filter]):
+                for param in page.get("Parameters", []):
+                    metadata[param["Name"]] = (
+                        param.get("Version"),
+                        param.get("LastModifiedDate"),
+                    )
+        except BotoClientError as e:
+            logger.error(
+                f"failed to describe ssm parameters: {self.path}. Reason: {e}"
+            )
+            raise e
+        return metadata
+
+
+def set_ssm_backend(backend: str) -> None:
+    """Select the backend parameter lookups are read from.
+
+    Parameters
+    ----------
+    backend: str
+        `boto3` reads from Parameter Store. `extension` reads from the
+        AWS Parameters and Secrets Lambda Extension over localhost, falling
+        back to Parameter Store when the extension misses or fails.
+        See `topshelfsoftware_aws_util.extension.Backend`.
+    """
+    global _ssm_backend
+
+    _ssm_backend = Backend(backend)
+    logger.debug(f"ssm backend: {_ssm_backend.value}")
+    return
+
+
+def _get_ssm_param(
+    name: str, with_decryption: bool, use_cache: bool, ttl: Optional[float]
+) -> SsmParameter:
+    """Retrieve a parameter, coalescing concurrent lookups and consulting
+    the positive and negative caches when requested."""
+    key = (name, with_decryption)
+
+    def _fetch():
+        return _ssm_flight.do(
+            key, lambda: _fetch_ssm_param(name, with_decryption)
+        )
+
+    if not use_cache:
+        return _fetch()
+
+    # the error response is cached rather than the exception, so that
+    # every hit raises a fresh exception instead of growing one traceback
+    not_found = ssm_negative_cache.get(key)
+    if not_found is not None:
+        logger.debug(f"ssm parameter not found (cached): {name}")
+        raise BotoClientError(not_found, "GetParameter")
+    try:
+        return ssm_cache.get_or_load(key, _fetch, ttl=ttl)
+    except BotoClientError as e:
+        if e.response.get("Error", {}).get("Code") == "ParameterNotFound":
+            ssm_negative_cache.set(key, e.response)
+        raise e
+
+
+def _decode_ssm_param(name: str, param: SsmParameter, as_json: bool) -> Any:
+    """Decode a parameter value, see `get_ssm_typed`."""
+    logger.debug(f"decoding ssm parameter: {name}")
+    if as_json:
+        try:
+            decoded = freeze(json.loads(param.value))
+        except json.JSONDecodeError as e:
+            # the exception message does not include the parameter value
+            logger.error(
+                f"failed to parse ssm parameter as json: {name}. {e.msg}"
+            )
+            raise e
+    elif param.type == "StringList":
+        decoded = tuple(param.value.split(","))
+    else:
+        decoded = param.value
+    return decoded
+
+
+def _cache_ssm_param(
+    name: str,
+    param: SsmParameter,
+    with_decryption: bool,
+    ttl: Optional[float],
+) -> None:
+    """Store a retrieved parameter to `ssm_cache`. Decryption only changes
+    SecureString values, so any other type is stored under both keys."""
+    ssm_cache.set((name, with_decryption), param, ttl)
+    if param.type != "SecureString":
+        ssm_cache.set((name, not with_decryption), param, ttl)
+    return
+
+
+def _fetch_ssm_param(name: str, with_decryption: bool) -> SsmParameter:
+    """Retrieve an SSM parameter from Parameter Store."""
+    logger.debug(f"getting ssm: {name}")
+    try:
+        ssm_resp = _get_parameter_resp(name, with_decryption)
         val = ssm_resp["Parameter"]["Value"]
         type_ = ssm_resp["Parameter"]["Type"]
     except BotoClientError as e:
@@ -46,9 +619,48 @@ def get_ssm_value(name: str, with_decryption: bool = False) -> str:
             f"{name}. Reason: {e}"
         )
         raise e
+    _log_ssm_value(name, val, type_)
+    return SsmParameter(val, type_)
+
+
+def _get_parameters(
+    names: List[str], with_decryption: bool
+) -> Tuple[Dict[str, SsmParameter], List[str]]:
+    """Retrieve a single chunk of parameters with `GetParameters`."""
+    try:
+        ssm_resp = ssm_client.get_parameters(
+            Names=names, WithDecryption=with_decryption
+        )
+    except BotoClientError as e:
+        logger.error(
+            f"failed to retrieve ssm parameters: {names}. Reason: {e}"
+        )
+        raise e
+    params = {}
+    for param in ssm_resp.get("Parameters", []):
+        params[param["Name"]] = SsmParameter(param["Value"], param["Type"])
+        _log_ssm_value(param["Name"], param["Value"], param["Type"])
+    return params, ssm_resp.get("InvalidParameters", [])
+
+
+def _log_ssm_value(name: str, val: str, type_: str) -> None:
+    """Log a parameter value, redacting SecureString values."""
     (
-        logger.debug(f"ssm parameter value: {val}")
+        logger.debug(f"ssm parameter value: {name}: {val}")
         if type_ != "SecureString"
-        else logger.debug("ssm parameter value: <redacted>")
+        else logger.debug(f"ssm parameter value: {name}: <redacted>")
     )
-    return val
+    return
+
+
+def _get_parameter_resp(name: str, with_decryption: bool) -> dict:
+    """Retrieve the `GetParameter` response from the selected backend."""
+    if _ssm_backend == Backend.EXTENSION:
+        try:
+            return get_parameter_from_extension(name, with_decryption)
+        except ExtensionError as e:
+            logger.warning(
+                f"extension failed to retrieve ssm parameter: {name}, "
+                f"falling back to boto3. Reason: {e}"
+            )
+    return ssm_client.get_parameter(Name=name, WithDecryption=with_decryption)